@@ -1239,15 +1239,18 @@ double *performLensingTransformation(\
     long nchan = my_lensing_transformer->SourcePlaneDataCube.size();
     long sizey = image_plane_sizey;
     long sizex = image_plane_sizex;
-    long i=0, j=0, ichan=0, ipixel=0;
+    long ichan=0;
     // 
     double *data = (double *)malloc(nchan*sizey*sizex*sizeof(double));
     std::fill(data, data+nchan*sizey*sizex, std::nan(""));
     for (ichan=0; ichan<nchan; ichan++) {
         if (GlobalDebug > 1) { std::cout << "copying data at ichan " << ichan << std::endl; }
         gsl_matrix_memcpy(my_lensing_transformer->SourcePlane2D, my_lensing_transformer->SourcePlaneDataCube[ichan]);
-        for (j=0; j<sizey; j++) {
-            for (i=0; i<sizex; i++) {
+        // The image plane rows of one channel are independent (the channels are not, as they share SourcePlane2D).
+        #pragma omp parallel for schedule(static)
+        for (long j=0; j<sizey; j++) {
+            long ipixel = (ichan*sizey + j) * sizex;
+            for (long i=0; i<sizex; i++) {
                 if (my_lensing_transformer->ImagePlane2D[j][i]) {
                     data[ipixel] = *(my_lensing_transformer->ImagePlane2D[j][i]);
                 }
@@ -8,6 +8,7 @@ from __future__ import (absolute_import, division, print_function,
 
 # Standard library
 import abc
+import functools
 import logging
 
 # Third party imports
@@ -507,15 +508,32 @@ def sersic_mr(r, mass, n, r_eff):
         Surface mass density as a function of `r`
     """
 
+    if (np.size(mass) == 1) and (np.size(n) == 1) and (np.size(r_eff) == 1):
+        bn, amp = _sersic_bn_amp(float(np.squeeze(n)), float(np.squeeze(r_eff)),
+                                 float(np.squeeze(mass)))
+    else:
+        bn = scp_spec.gammaincinv(2. * n, 0.5)
+        alpha = r_eff / (bn ** n)
+        amp = (mass / (2 * np.pi) / alpha ** 2 / n /
+               scp_spec.gamma(2. * n))
+    mr = amp * np.exp(-bn * (r * (1. / r_eff)) ** (1. / n))
+
+    return mr
+
+
+@functools.lru_cache(maxsize=32)
+def _sersic_bn_amp(n, r_eff, mass):
+    """
+    Sersic b_n and central surface density amplitude, cached as these are
+    fixed for repeated evaluations with the same parameters.
+    """
     bn = scp_spec.gammaincinv(2. * n, 0.5)
     alpha = r_eff / (bn ** n)
     amp = (mass / (2 * np.pi) / alpha ** 2 / n /
            scp_spec.gamma(2. * n))
-    mr = amp * np.exp(-bn * (r / r_eff) ** (1. / n))
+    return bn, amp
 
-    return mr
-
-def truncate_sersic_mr(r, mass, n, r_eff, r_inner, r_outer):
+def truncate_sersic_mr(r, mass, n, r_eff, r_inner, r_outer, dtype=np.float64):
     """
     Radial surface mass density function for a generic sersic model
 
@@ -539,6 +557,9 @@ def truncate_sersic_mr(r, mass, n, r_eff, r_inner, r_outer):
     r_outer: float
         Outer truncation radius
 
+    dtype : numpy dtype, optional
+        Floating point type of the evaluation. Default: np.float64
+
     Returns
     -------
     mr : float or array
@@ -550,12 +571,30 @@ def truncate_sersic_mr(r, mass, n, r_eff, r_inner, r_outer):
     else:
         rarr = np.array(r)
     # Ensure all radii are 0. or positive:
-    rarr = np.abs(rarr)
-
-    mr = sersic_mr(rarr, mass, n, r_eff)
-
-    wh_out = np.where((rarr < r_inner) | (rarr > r_outer))
-    mr[wh_out] = 0.
+    rarr = np.abs(np.asarray(rarr, dtype=dtype))
+
+    n = float(np.squeeze(n))
+    r_eff = float(np.squeeze(r_eff))
+    r_inner = float(np.squeeze(r_inner))
+    r_outer = float(np.squeeze(r_outer))
+    if (r_inner > 0.) or (r_outer < np.inf):
+        wh_in = (rarr >= r_inner) & (rarr <= r_outer)
+    else:
+        wh_in = None
+
+    # Same as sersic_mr, evaluated in place in the rarr buffer:
+    bn, amp = _sersic_bn_amp(n, r_eff, float(np.squeeze(mass)))
+    mr = rarr
+    mr *= 1. / r_eff
+    if n != 1.:
+        np.power(mr, 1. / n, out=mr)
+    mr *= -bn
+    np.exp(mr, out=mr)
+    mr *= amp
+
+    if wh_in is not None:
+        # Zero outside the truncation radii by a multiply, not a masked store
+        mr *= wh_in
 
     if (len(rarr) > 1):
         return mr
@@ -568,6 +607,14 @@ def truncate_sersic_mr(r, mass, n, r_eff, r_inner, r_outer):
             return mr
 
 def _I0_gaussring(r_peak, sigma_r, L_tot):
+    if (np.size(r_peak) == 1) and (np.size(sigma_r) == 1) and (np.size(L_tot) == 1):
+        return _I0_gaussring_cached(float(np.squeeze(r_peak)),
+                                    float(np.squeeze(sigma_r)),
+                                    float(np.squeeze(L_tot)))
+    return _I0_gaussring_cached.__wrapped__(r_peak, sigma_r, L_tot)
+
+@functools.lru_cache(maxsize=32)
+def _I0_gaussring_cached(r_peak, sigma_r, L_tot):
     x = r_peak / (sigma_r * np.sqrt(2.))
     Ih = np.sqrt(np.pi)*x*(1.+scp_spec.erf(x)) + np.exp(-x**2)
     I0 = L_tot / (2.*np.pi*(sigma_r**2)*Ih)
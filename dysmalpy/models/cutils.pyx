@@ -1,8 +1,11 @@
 #cython: boundscheck=False, wraparound=False, nonecheck=False, cdivision=True
+#cython: language_level=3, initializedcheck=False
+#cython: binding=False, profile=False, linetrace=False
 # Module containing Cython functions for speed optimization
 
 # from math import exp, sqrt, pi
 from libc.math cimport exp, sqrt, pi
+from cython.parallel cimport prange
 import numpy as np
 
 #cdef extern from "vfastexp.h":
@@ -10,10 +13,11 @@ import numpy as np
 
 DTYPE_t = np.float64
 
-def populate_cube(double [:, :, :] flux,
-                  double [:, :, :] vel,
-                  double [:, :, :] sigma,
-                  double [:] vspec):
+def populate_cube(const double [:, :, :] flux,
+                  const double [:, :, :] vel,
+                  const double [:, :, :] sigma,
+                  const double [:] vspec,
+                  int num_threads=1):
 
     cdef Py_ssize_t s, x, y, z
     cdef double amp, v, sig, f
@@ -21,7 +25,12 @@ def populate_cube(double [:, :, :] flux,
     result_np = np.zeros([len(vspec), flux.shape[1], flux.shape[2]], dtype=DTYPE_t)
     cdef double [:, :, :] result = result_np
 
-    for x in range(flux.shape[2]):
+    if num_threads < 1:
+        num_threads = 1
+
+    # Each x writes only to its own result[:, :, x] column: run them in parallel
+    for x in prange(flux.shape[2], nogil=True, schedule='static',
+                    num_threads=num_threads):
         for y in range(flux.shape[1]):
             for z in range(flux.shape[0]):
 
@@ -38,11 +47,11 @@ def populate_cube(double [:, :, :] flux,
 
 
     
-def populate_cube_ais(double [:, :, :] flux,
-                  double [:, :, :] vel,
-                  double [:, :, :] sigma,
-                  double [:] vspec,
-                  long [:, :] ai):
+def populate_cube_ais(const double [:, :, :] flux,
+                  const double [:, :, :] vel,
+                  const double [:, :, :] sigma,
+                  const double [:] vspec,
+                  const long [:, :] ai):
 
     cdef Py_ssize_t s, x, y, z, i
     cdef double amp, v, sig, f
@@ -0,0 +1,67 @@
+# coding=utf8
+# Copyright (c) MPE/IR-Submm Group. See LICENSE.rst for license information.
+#
+# Numba versions of the Cython cube population functions in cutils.pyx,
+#   used by ModelSet if the Cython module cannot be built or imported
+
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+# Standard library
+import math
+
+# Third party imports
+import numpy as np
+
+# Local imports
+from .utils import njit
+
+__all__ = ['populate_cube', 'populate_cube_ais']
+
+DTYPE_t = np.float64
+
+
+@njit(cache=True, error_model='numpy')
+def populate_cube(flux, vel, sigma, vspec, num_threads=1):
+    """Sum the Gaussian line profiles of all (z, y, x) cells into a (spec, y, x) cube.
+
+    num_threads is accepted for compatibility with cutils; this version is serial.
+    """
+    result = np.zeros((vspec.shape[0], flux.shape[1], flux.shape[2]), dtype=DTYPE_t)
+
+    for x in range(flux.shape[2]):
+        for y in range(flux.shape[1]):
+            for z in range(flux.shape[0]):
+
+                v = vel[z, y, x]
+                sig = sigma[z, y, x]
+                f = flux[z, y, x]
+                amp = f / math.sqrt(2.0 * math.pi * sig)
+
+                for s in range(vspec.shape[0]):
+
+                    result[s, y, x] += amp * math.exp(-0.5 * ((vspec[s] - v) / sig) **2)
+
+    return result
+
+
+@njit(cache=True, error_model='numpy')
+def populate_cube_ais(flux, vel, sigma, vspec, ai):
+    """As `populate_cube`, but only for the cells with (x, y, z) indices in the columns of `ai`."""
+    result = np.zeros((vspec.shape[0], flux.shape[1], flux.shape[2]), dtype=DTYPE_t)
+
+    for i in range(ai.shape[1]):
+        x = ai[0, i]
+        y = ai[1, i]
+        z = ai[2, i]
+
+        v = vel[z, y, x]
+        sig = sigma[z, y, x]
+        f = flux[z, y, x]
+        amp = f / math.sqrt(2.0 * math.pi * sig)
+
+        for s in range(vspec.shape[0]):
+
+            result[s, y, x] += amp * math.exp(-0.5 * ((vspec[s] - v) / sig) **2)
+
+    return result
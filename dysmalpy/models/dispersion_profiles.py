@@ -61,4 +61,5 @@ class DispersionConst(DispersionProfile):
     @staticmethod
     def evaluate(r, sigma0):
         """Dispersion as a function of radius"""
-        return np.ones(r.shape)*sigma0
+        # Read-only, zero-copy view: no full-size allocation needed
+        return np.broadcast_to(sigma0, np.shape(r))
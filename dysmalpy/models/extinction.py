@@ -15,6 +15,7 @@ import numpy as np
 
 # Local imports
 from .base import _DysmalFittable3DModel
+from .utils import _numba_installed
 from dysmalpy.parameters import DysmalParameter
 
 __all__ = ['ThinCentralPlaneDustExtinction', 'ForegroundConstantExtinction',
@@ -29,6 +30,29 @@ import warnings
 warnings.filterwarnings("ignore")
 
 
+def _thin_plane_attenuation_np(x, y, z, xshift, yshift, sin_pa, cos_pa,
+                               sin_inc, cos_inc, atten):
+    ytmp = -(x - xshift) * sin_pa + (y - yshift) * cos_pa
+    zsky_dust = (ytmp * cos_inc - z * sin_inc) * (-sin_inc)
+    return np.where(z <= zsky_dust, atten, 1.)
+
+# Fused, multithreaded kernel for the thin dust plane attenuation:
+# a single pass over (x, y, z), without the intermediate rotated cubes.
+if _numba_installed:
+    from numba import vectorize
+
+    @vectorize(['float64(float64, float64, float64, float64, float64, '
+                'float64, float64, float64, float64, float64)'], target='parallel',
+               cache=True)
+    def _thin_plane_attenuation_nb(x, y, z, xshift, yshift, sin_pa, cos_pa,
+                                   sin_inc, cos_inc, atten):
+        ytmp = -(x - xshift) * sin_pa + (y - yshift) * cos_pa
+        zsky_dust = (ytmp * cos_inc - z * sin_inc) * (-sin_inc)
+        if z <= zsky_dust:
+            return atten
+        return 1.
+
+
 
 class DustExtinction(_DysmalFittable3DModel):
     r"""
@@ -98,17 +122,13 @@ class ThinCentralPlaneDustExtinction(DustExtinction):
         inc = np.pi / 180. * inc
         pa = np.pi / 180. * (pa - 90.)
 
-        xsky = x - xshift
-        ysky = y - yshift
-        zsky = z
-
-        ytmp = -xsky * np.sin(pa) + ysky * np.cos(pa)
-
-        ydust = ytmp * np.cos(inc) - zsky * np.sin(inc)
-
-        zsky_dust = ydust * np.sin(-inc)
-        extinction = np.ones(x.shape)
-        extinction[zsky <= zsky_dust] = (1.-amp_extinct)
+        # Positions behind the dust plane (along the LOS) are attenuated
+        args = (x, y, z, xshift, yshift, np.sin(pa), np.cos(pa),
+                np.sin(inc), np.cos(inc), 1.-amp_extinct)
+        if _numba_installed:
+            extinction = _thin_plane_attenuation_nb(*args)
+        else:
+            extinction = _thin_plane_attenuation_np(*args)
 
         return extinction
 
@@ -188,7 +208,7 @@ class ForegroundExponentialExtinction(DustExtinction):
     def evaluate(x, y, z, Alam0, rd):
         # Geometry: must be in correct source plane already!
         # Consider exponential in midplane, regardless of z.
-        r = np.sqrt(x**2 + y**2)
+        r = np.sqrt(x*x + y*y)
         Alam = Alam0 * np.exp(-(r/rd))
         extinction = np.power(10., -0.4*Alam)
         return extinction
@@ -7,7 +7,9 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 # Standard library
+import functools
 import logging
+import math
 
 # Third party imports
 import numpy as np
@@ -26,6 +28,30 @@ from dysmalpy.parameters import DysmalParameter
 __all__ = ['Geometry']
 
 
+def _param_value(par):
+    return float(getattr(par, 'value', par))
+
+
+@functools.lru_cache(maxsize=256)
+def _affine_matrix_cached(inc, pa):
+    """
+    Galaxy-to-sky affine matrix (cube axes z, y, x) for `inc`, `pa` in degrees.
+
+    Closed form of the product of the inclination and position angle rotations,
+    returned read-only as it is shared between calls.
+    """
+    inc = math.pi / 180. * inc
+    pa = math.pi / 180. * (pa - 90.)
+    ci, si = math.cos(inc), math.sin(inc)
+    cp, sp = math.cos(pa), math.sin(pa)
+
+    transf_matrix = np.array([[ci,  si*cp, -si*sp],
+                              [-si, ci*cp, -ci*sp],
+                              [0.,  sp,     cp]])
+    transf_matrix.flags.writeable = False
+    return transf_matrix
+
+
 # LOGGER SETTINGS
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('DysmalPy')
@@ -59,6 +85,11 @@ class Geometry(_DysmalFittable3DModel):
     obs_name : string
         (Attribute): Name of the observation to which this geometry belongs.
 
+    interp_order : int, optional
+        (Attribute): Spline interpolation order used by `transform_cube_affine`.
+        Default: 3. Lower orders (e.g., 1 for trilinear) are substantially faster,
+        and the spline prefilter is skipped for `interp_order <= 1`.
+
     Methods
     -------
     coord_transform:
@@ -82,15 +113,17 @@ class Geometry(_DysmalFittable3DModel):
     vel_shift = DysmalParameter(default=0.0, fixed=True)  # default: none
 
     obs_name = 'galaxy'
+    interp_order = 3
 
     _type = 'geometry'
     outputs = ('xp', 'yp', 'zp')
 
-    def __init__(self, obs_name=None, **kwargs):
+    def __init__(self, obs_name=None, interp_order=3, **kwargs):
         if obs_name is None:
             raise ValueError("Geometries must have an 'obs_name' specified!")
 
         self.obs_name = obs_name
+        self.interp_order = interp_order
 
         super(Geometry, self).__init__(**kwargs)
 
@@ -159,9 +192,6 @@ class Geometry(_DysmalFittable3DModel):
         if xshift is None:  xshift = self.xshift
         if yshift is None:  yshift = self.yshift
 
-        inc = np.pi / 180. * inc
-        pa = np.pi / 180. * (pa - 90.)
-
         c_in =  get_cin_cout(cube.shape)
         if output_shape is not None:
             c_out = get_cin_cout(output_shape)
@@ -169,20 +199,14 @@ class Geometry(_DysmalFittable3DModel):
             c_out = get_cin_cout(cube.shape)
 
         # # CUBE: z, y, x
-        minc = np.array([[np.cos(inc), np.sin(inc),  0.],
-                         [-np.sin(inc), np.cos(inc), 0.],
-                         [0., 0., 1.]])
-
-        mpa = np.array([[1., 0., 0.],
-                        [0., np.cos(pa), -np.sin(pa)],
-                        [0., np.sin(pa), np.cos(pa)]])
-
-        transf_matrix = np.matmul(minc, mpa)
-        offset_arr = np.array([0., yshift.value, xshift.value])
-        offset_transf = c_in-np.matmul(transf_matrix,c_out+offset_arr)
-
-        cube_sky = scp_ndi.interpolation.affine_transform(cube, transf_matrix,
-                    offset=offset_transf, order=3, output_shape=output_shape)
+        transf_matrix = _affine_matrix_cached(_param_value(inc), _param_value(pa))
+        offset_arr = np.array([0., _param_value(yshift), _param_value(xshift)])
+        offset_transf = c_in - transf_matrix.dot(c_out+offset_arr)
+
+        cube_sky = scp_ndi.affine_transform(cube, transf_matrix,
+                    offset=offset_transf, order=self.interp_order,
+                    prefilter=(self.interp_order > 1),
+                    output_shape=output_shape)
 
         return cube_sky
 
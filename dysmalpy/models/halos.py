@@ -10,6 +10,8 @@ from __future__ import (absolute_import, division, print_function,
 import abc
 import logging
 import copy
+import functools
+import math
 
 # Third party imports
 import numpy as np
@@ -22,7 +24,8 @@ import astropy.cosmology as apy_cosmo
 
 # Local imports
 from .model_set import ModelSet
-from .base import MassModel
+from .base import MassModel, v_circular
+from .utils import njit
 from dysmalpy.parameters import DysmalParameter
 
 __all__ = ['NFW', 'TwoPowerHalo', 'Burkert', 'Einasto', 'DekelZhao', 'LinearNFW']
@@ -38,6 +41,50 @@ pc = apy_con.pc
 
 g_pc_per_Msun_kmssq = G.to(u.pc / u.Msun * (u.km / u.s) ** 2).value
 
+
+def _calc_rvir(mvir_lin, hz):
+    # Virial radius in kpc, for linear virial mass(es) and H(z) in km/s/Mpc
+    return (mvir_lin * (g_pc_per_Msun_kmssq * 1e-3) / (10 * hz * 1e-3) ** 2) ** (1. / 3.)
+
+@functools.lru_cache(maxsize=4096)
+def _calc_rvir_cached(lmvir, hz):
+    # Memoized scalar version, keyed on plain floats (log virial mass, H(z))
+    return _calc_rvir(10 ** lmvir, hz)
+
+@njit(cache=True)
+def _nfw_menc_scalar(r, rho0, rvir, conc):
+    # Scalar NFW enclosed mass, bypassing numpy's array machinery (eg for root finding)
+    u = r*conc/rvir
+    return 4.*math.pi*rho0*rvir**3/conc**3 * (math.log1p(u) - u/(1.+u))
+
+@njit(cache=True)
+def _dz_menc_scalar(r, mvir, rvir, a, c, mu):
+    # Scalar Dekel-Zhao enclosed mass
+    x = r*c/rvir
+    if x == 0.:
+        # Limit of x^(3-a) as x -> 0
+        if a < 3.:
+            return 0.
+        elif a == 3.:
+            return mu*mvir
+        else:
+            return math.inf
+    logterm = (a-3.)*math.log(x) + 2.*(3.-a)*math.log1p(math.sqrt(x))
+    return mu*mvir*math.exp(-logterm)
+
+@functools.lru_cache(maxsize=256)
+def _calc_a_c_DZ_cached(s1, c2):
+    # Dekel-Zhao inner slope a and concentration c, from s1, c2
+    #rvirial = self.calc_rvir()
+    #r12 = np.sqrt(0.01*rvirial/rvirial)
+    # Scalar-only: use plain floats / math instead of numpy ufuncs
+    r12 = 0.1   # sqrt(0.01)
+    c12 = math.sqrt(c2)
+    a = (1.5*s1 - 2.*(3.5-s1)*r12*c12)/(1.5 - (3.5-s1)*r12*c12)
+    c = ((s1-2.)/((3.5-s1)*r12 - 1.5/c12))**2
+
+    return a, c
+
 # # +++++++++++++++++++++++++++++
 # # TEMP:
 # G = 6.67e-11 * u.m**3 / u.kg / (u.s**2)  #(unit='m3 / (kg s2)')
@@ -159,13 +206,18 @@ class DarkMatterHalo(MassModel):
     def _set_hz(self):
         self._hz = self.cosmo.H(self.z).value
 
-    def calc_rvir(self):
+    def calc_rvir(self, mvirial=None):
         r"""
         Calculate the virial radius based on virial mass and redshift
 
+        Parameters
+        ----------
+        mvirial : float or array, optional
+            Virial mass(es) to use instead of the current `mvirial` value.
+
         Returns
         -------
-        rvir : float
+        rvir : float or array
             Virial radius
 
         Notes
@@ -183,8 +235,11 @@ class DarkMatterHalo(MassModel):
         # hz = self.cosmo.H(self.z).value
         # rvir = ((10 ** self.mvirial * (g_pc_per_Msun_kmssq * 1e-3) /
         #         (10 * hz * 1e-3) ** 2) ** (1. / 3.))
-        rvir = ((10 ** self.mvirial * (g_pc_per_Msun_kmssq * 1e-3) /
-                (10 * self._hz * 1e-3) ** 2) ** (1. / 3.))
+        if mvirial is None:
+            # H(z) is already cached on the halo; memoize on (mvirial, H(z))
+            rvir = _calc_rvir_cached(float(self.mvirial.value), self._hz)
+        else:
+            rvir = _calc_rvir(10 ** mvirial, self._hz)
 
         return rvir
 
@@ -230,15 +285,16 @@ class DarkMatterHalo(MassModel):
         This uses the current value of `fdm` together with
         the input baryon distribution to calculate the inferred `mvirial`.
         """
-        if (self.fdm.value > self.bounds['fdm'][1]) | \
-                ((self.fdm.value < self.bounds['fdm'][0])):
+        # Read fdm and its bounds once; edge cases are checked in priority order
+        fdm = float(self.fdm.value)
+        fdm_lo, fdm_hi = self.bounds['fdm']
+        if (fdm > fdm_hi) or (fdm < fdm_lo):
             mvirial = np.NaN
-        elif (self.fdm.value == 1.):
+        elif (fdm == 1.):
             mvirial = np.inf
-        elif (self.fdm.value == 0.):
+        elif (fdm < 1.e-10):
+            # Includes fdm = 0
             mvirial = -np.inf #-5.  # as a small but finite value
-        elif (self.fdm.value < 1.e-10):
-            mvirial = -np.inf
         elif (r_fdm < 0.):
             mvirial = np.NaN
         else:
@@ -253,7 +309,7 @@ class DarkMatterHalo(MassModel):
                 vsqr_bar_re = baryons.vcirc_sq(r_fdm)
                 bar_mtot = baryons.total_mass.value
 
-            vsqr_dm_re_target = vsqr_bar_re / (1./self.fdm.value - 1)
+            vsqr_dm_re_target = vsqr_bar_re / (1./fdm - 1)
 
             if not np.isfinite(vsqr_dm_re_target):
                 mvirial = np.NaN
@@ -263,10 +319,10 @@ class DarkMatterHalo(MassModel):
                 try:
                     if ((bar_mtot >= 8.) & (bar_mtot <=13.)):
                         whminz = np.argmin(np.abs(_dict_lmvir_fac_test_z['zarr']-self.z))
-                        whminfdm = np.argmin(np.abs(_dict_lmvir_fac_test_z['fdmarr']-self.fdm.value))
+                        whminfdm = np.argmin(np.abs(_dict_lmvir_fac_test_z['fdmarr']-fdm))
 
                         fac_lmvir = _dict_lmvir_fac_test_z['facarr'][whminz,whminfdm]
-                        rough_mvir = fac_lmvir - np.log10(1./self.fdm.value-1)+np.log10(0.5)+bar_mtot
+                        rough_mvir = fac_lmvir - np.log10(1./fdm-1)+np.log10(0.5)+bar_mtot
 
                         mtest = np.arange(rough_mvir-1., rough_mvir+1.5, 0.5)
                         mtest = np.append(-5., mtest)
@@ -277,21 +333,17 @@ class DarkMatterHalo(MassModel):
                 except:
                     mtest = np.arange(-5, 50, 1.0)
 
-                vtest = np.array([self._minfunc_vdm_mvir_from_fdm(m, vsqr_dm_re_target,
-                        r_fdm, baryons, adiabatic_contract) for m in mtest])
+                # One scratch copy of the halo for all the trial mvirial values:
+                scratch = self._mvir_from_fdm_scratch(baryons, adiabatic_contract)
+
+                vtest = self._vtest_mvir_from_fdm(mtest, vsqr_dm_re_target,
+                            r_fdm, scratch, adiabatic_contract)
                 try:
                     a = mtest[vtest < 0][-1]
                     b = mtest[vtest > 0][0]
-                    # # TEST
-                    # if adiabatic_contract:
-                    #     a_noAC = mtest[vtest_noAC < 0][-1]
-                    #     b_noAC = mtest[vtest_noAC > 0][0]
-                except:
-                    print("adiabatic_contract={}".format(adiabatic_contract))
-                    print("fdm={}".format(self.fdm.value))
-                    print("r_fdm={}".format(r_fdm))
-                    print(mtest, vtest)
-                    raise ValueError
+                except IndexError:
+                    raise ValueError(self._msg_mvir_bracket_fail(mtest, vtest, r_fdm,
+                                                                 adiabatic_contract))
 
                 # ------------------------------------------------------------------
                 # Do a quick check to make sure it was inside the inner range:
@@ -307,47 +359,130 @@ class DarkMatterHalo(MassModel):
                         mtest = np.append(mtest, np.arange(np.floor(mtest_orig[-2])+3., np.floor(mtest_orig[-2])+23., 2.0))
                         mtest = np.append(mtest, 50.)
 
-                    vtest = np.array([self._minfunc_vdm_mvir_from_fdm(m, vsqr_dm_re_target, r_fdm,
-                                        baryons, adiabatic_contract) for m in mtest])
+                    vtest = self._vtest_mvir_from_fdm(mtest, vsqr_dm_re_target,
+                                r_fdm, scratch, adiabatic_contract)
                     try:
                         a = mtest[vtest < 0][-1]
                         b = mtest[vtest > 0][0]
-                    except:
-                        print("adiabatic_contract={}".format(adiabatic_contract))
-                        print("fdm={}".format(self.fdm.value))
-                        print("r_fdm={}".format(r_fdm))
-                        print(mtest, vtest)
-                        raise ValueError
+                    except IndexError:
+                        raise ValueError(self._msg_mvir_bracket_fail(mtest, vtest, r_fdm,
+                                                                     adiabatic_contract))
 
                 # ------------------------------------------------------------------
                 # Run optimizer:
                 mvirial = scp_opt.brentq(self._minfunc_vdm_mvir_from_fdm, a, b, args=(vsqr_dm_re_target, r_fdm,
-                                        baryons, adiabatic_contract))
+                                        scratch, adiabatic_contract))
         return mvirial
 
 
-    def _minfunc_vdm_mvir_from_fdm(self, mvirial, vsqtarget, r_fdm, bary, adiabatic_contract):
+    def _msg_mvir_bracket_fail(self, mtest, vtest, r_fdm, adiabatic_contract):
+        return ("Could not bracket mvirial: adiabatic_contract={}, fdm={}, r_fdm={}\n"
+                "mtest={}\nvtest={}".format(adiabatic_contract, self.fdm.value,
+                                             r_fdm, mtest, vtest))
+
+    def _vtest_mvir_from_fdm(self, mtest, vsqtarget, r_fdm, scratch, adiabatic_contract):
+        # Bracket scan: for a bare halo all trial masses are evaluated in one batch
+        halotmp, modtmp = scratch
+        if modtmp is None:
+            return self.circular_velocity_batch(r_fdm, mtest)**2 - vsqtarget
+        else:
+            return np.array([self._minfunc_vdm_mvir_from_fdm(m, vsqtarget, r_fdm,
+                             scratch, adiabatic_contract) for m in mtest])
+
+    def _mvir_from_fdm_scratch(self, bary, adiabatic_contract):
+        """
+        Copy of the halo on which the trial mvirial values are set, made once
+        per `calc_mvirial_from_fdm` call.
 
+        Returns (halotmp, modtmp). With adiabatic contraction, or if other halo
+        parameters are tied (e.g., DZ s1, c2 tied to mvirial), the copy is put in
+        a ModelSet with the baryons, so it can be contracted / re-tied; otherwise
+        modtmp is None.
+        """
         halotmp = self.copy()
-        halotmp.__setattr__('mvirial', mvirial)
+        if (not adiabatic_contract) and (len(self._tied_shape_params()) == 0):
+            return halotmp, None
 
+        modtmp = ModelSet()
+        if isinstance(bary, dict):
+            for bcmp,b_light in zip(bary['components'], bary['light']):
+                modtmp.add_component(bcmp, light=b_light)
+        else:
+            modtmp.add_component(bary, light=True)
+        modtmp.add_component(halotmp)
+        modtmp.kinematic_options.adiabatic_contract = adiabatic_contract
         if adiabatic_contract:
-            modtmp = ModelSet()
-            if isinstance(bary, dict):
-                for bcmp,b_light in zip(bary['components'], bary['light']):
-                    modtmp.add_component(bcmp, light=b_light)
-            else:
-                modtmp.add_component(bary, light=True)
-            modtmp.add_component(halotmp)
-            modtmp.kinematic_options.adiabatic_contract = True
             modtmp.kinematic_options.adiabatic_contract_modify_small_values = True
+        return halotmp, modtmp
+
+    def _tied_shape_params(self):
+        # Tied halo parameters that change with the trial mvirial. mvirial itself is
+        # the solved-for value, and fdm does not enter the halo rotation curve.
+        return [pp for pp in self.param_names
+                if self.tied[pp] and (pp not in ['mvirial', 'fdm'])]
+
+    def _minfunc_vdm_mvir_from_fdm(self, mvirial, vsqtarget, r_fdm, scratch, adiabatic_contract):
+        halotmp, modtmp = scratch
+        if modtmp is None:
+            # Only the halo itself is needed: no full ModelSet
+            halotmp.mvirial = mvirial
+            return halotmp.vcirc_sq(r_fdm) - vsqtarget
+
+        modtmp.set_parameter_value(halotmp.name, 'mvirial', mvirial, skip_updated_tied=True)
+        if adiabatic_contract:
             modtmp._update_tied_parameters()
-
             vc_sq, vc_sq_dm = modtmp.vcirc_sq(r_fdm, compute_dm=True)
             return vc_sq_dm - vsqtarget
-        else:
-            return halotmp.vcirc_sq(r_fdm)- vsqtarget
 
+        # Re-apply the ties for this trial mvirial
+        for pp in self._tied_shape_params():
+            modtmp.set_parameter_value(halotmp.name, pp, halotmp.tied[pp](modtmp),
+                                       skip_updated_tied=True)
+        return halotmp.vcirc_sq(r_fdm) - vsqtarget
+
+    def enclosed_mass_batch(self, r, mvirials):
+        """
+        Enclosed mass at radius `r` for a set of trial virial masses
+
+        Parameters
+        ----------
+        r : float
+            Radius in kpc
+
+        mvirials : array
+            Virial masses (in the same units as `mvirial`) at which to evaluate
+
+        Returns
+        -------
+        menc : array
+            Enclosed mass in solar units, with shape `(len(mvirials),)`
+        """
+        # Vary mvirial on a copy, so this halo is never modified
+        halotmp = self.copy()
+        menc = np.empty(len(mvirials))
+        for i, mvirial in enumerate(mvirials):
+            halotmp.mvirial = mvirial
+            menc[i] = halotmp.enclosed_mass(r)
+        return menc
+
+    def circular_velocity_batch(self, r, mvirials):
+        """
+        Circular velocity at radius `r` for a set of trial virial masses
+
+        Parameters
+        ----------
+        r : float
+            Radius in kpc
+
+        mvirials : array
+            Virial masses (in the same units as `mvirial`) at which to evaluate
+
+        Returns
+        -------
+        vcirc : array
+            Circular velocity in km/s, with shape `(len(mvirials),)`
+        """
+        return v_circular(self.enclosed_mass_batch(r, mvirials), r)
 
 
 class NFW(DarkMatterHalo):
@@ -424,14 +559,49 @@ class NFW(DarkMatterHalo):
 
         rvirial = self.calc_rvir()
         rho0 = self.calc_rho0(rvirial=rvirial)
-        rs = rvirial/self.conc
+
+        if np.isscalar(r):
+            return _nfw_menc_scalar(float(r), float(rho0), float(rvirial), float(self.conc.value))
+
+        rs_inv = self.conc/rvirial
         aa = 4.*np.pi*rho0*rvirial**3/self.conc**3
 
-        # For very small r, bb can be negative.
-        bb = np.abs(np.log((rs + r)/rs) - r/(rs + r))
+        # Use log1p to avoid cancellation at small r (bb >= 0 analytically)
+        u = r*rs_inv
+        bb = np.log1p(u) - u/(1.+u)
 
         return aa*bb
 
+    def enclosed_mass_batch(self, r, mvirials):
+        """
+        Enclosed mass at radius `r` for a set of trial virial masses
+
+        Parameters
+        ----------
+        r : float
+            Radius in kpc
+
+        mvirials : array
+            Virial masses at which to evaluate
+
+        Returns
+        -------
+        menc : array
+            Enclosed mass in solar units, with shape `(len(mvirials),)`
+
+        Notes
+        -----
+        For fixed concentration, :math:`M(<r) = M_{\rm vir} f(r c/r_{\rm vir})/f(c)`
+        with :math:`f(u) = \ln(1+u) - u/(1+u)`, so all masses are broadcast at once.
+        """
+        mvirials = np.asarray(mvirials, dtype=float)
+        conc = self.conc.value
+        rvir = self.calc_rvir(mvirial=mvirials)
+        u = r*conc/rvir
+        fc = np.log1p(conc) - conc/(1.+conc)
+
+        return 10**mvirials*(np.log1p(u) - u/(1.+u))/fc
+
     def calc_rho0(self, rvirial=None):
         r"""
         Normalization of the density distribution
@@ -1156,7 +1326,10 @@ class DekelZhao(DarkMatterHalo):
         rc = rvirial / c
         x = r / rc
 
-        return rhoc / (np.power(x, a) * np.power((1.+np.sqrt(x)), 2.*(3.5-a)))
+        # Fused form of rhoc / (x^a * (1+sqrt(x))^(2(3.5-a))): one exp instead of two pows
+        logterm = scp_spec.xlogy(a, x) + 2.*(3.5-a)*np.log1p(np.sqrt(x))
+
+        return rhoc * np.exp(-logterm)
 
     def enclosed_mass(self, r):
         """
@@ -1175,12 +1348,18 @@ class DekelZhao(DarkMatterHalo):
         mvir = 10**self.mvirial
         rvirial = self.calc_rvir()
         a, c = self.calc_a_c()
+        mu = self.calc_mu(a=a, c=c)
+
+        if np.isscalar(r):
+            return _dz_menc_scalar(float(r), float(mvir), float(rvirial), a, c, mu)
 
         rc = rvirial / c
         x = r / rc
-        mu = self.calc_mu(a=a, c=c)
 
-        return mu * mvir / (np.power(x, a-3.)*np.power((1.+np.sqrt(x)), 2.*(3.-a)))
+        # Fused form of 1 / (x^(a-3) * (1+sqrt(x))^(2(3-a)))
+        logterm = scp_spec.xlogy(a-3., x) + 2.*(3.-a)*np.log1p(np.sqrt(x))
+
+        return mu * mvir * np.exp(-logterm)
 
     def calc_a_c(self):
         r"""
@@ -1191,14 +1370,8 @@ class DekelZhao(DarkMatterHalo):
         a, c:   inner asymptotic slope, concentration parameter for DZ halo
 
         """
-        #rvirial = self.calc_rvir()
-        #r12 = np.sqrt(0.01*rvirial/rvirial)
-        r12 = np.sqrt(0.01)
-        c12 = np.sqrt(self.c2)
-        a = (1.5*self.s1 - 2.*(3.5-self.s1)*r12*c12)/(1.5 - (3.5-self.s1)*r12*c12)
-        c = ((self.s1-2.)/((3.5-self.s1)*r12 - 1.5/c12))**2
-
-        return a, c
+        # Only depends on the free parameters (s1, c2): memoized
+        return _calc_a_c_DZ_cached(float(self.s1.value), float(self.c2.value))
 
     def calc_rho0(self, rvirial=None, a=None, c=None):
         r"""
@@ -1222,11 +1395,11 @@ class DekelZhao(DarkMatterHalo):
         r"""
         Average density in the virial radius, in :math:`M_{\odot}/\rm{kpc}^3`
         """
-        mvir = 10**self.mvirial
+        mvir = 10**float(self.mvirial.value)
         if rvirial is None:
             rvirial = self.calc_rvir()
 
-        rhovirbar = (3.*mvir)/(4.*np.pi*(rvirial**3))
+        rhovirbar = (3.*mvir)/(4.*math.pi*(rvirial**3))
         return rhovirbar
 
     def calc_mu(self, a=None, c=None):
@@ -1236,31 +1409,9 @@ class DekelZhao(DarkMatterHalo):
         if (a is None) or (c is None):
             a, c = self.calc_a_c()
 
-        mu = np.power(c, a-3.) * np.power((1.+np.sqrt(c)), 2.*(3.-a))
+        mu = c**(a-3.) * (1.+math.sqrt(c))**(2.*(3.-a))
         return mu
 
-    def _minfunc_vdm_mvir_from_fdm(self, mvirial, vsqtarget, r_fdm, bary, adiabatic_contract):
-        halotmp = self.copy()
-        halotmp.__setattr__('mvirial', mvirial)
-
-        modtmp = ModelSet()
-        if isinstance(bary, dict):
-            for bcmp,b_light in zip(bary['components'], bary['light']):
-                modtmp.add_component(bcmp, light=b_light)
-        else:
-            modtmp.add_component(bary, light=True)
-        modtmp.add_component(halotmp)
-        modtmp.kinematic_options.adiabatic_contract = adiabatic_contract
-        if adiabatic_contract:
-            modtmp.kinematic_options.adiabatic_contract_modify_small_values = True
-        modtmp._update_tied_parameters()
-
-        if adiabatic_contract:
-            vc_sq, vc_sq_dm = modtmp.vcirc_sq(r_fdm, compute_dm=True)
-            return vc_sq_dm - vsqtarget
-        else:
-            return modtmp.components['halo'].vcirc_sq(r_fdm) - vsqtarget
-
 
 class LinearNFW(DarkMatterHalo):
     r"""
@@ -1336,14 +1487,49 @@ class LinearNFW(DarkMatterHalo):
 
         rvirial = self.calc_rvir()
         rho0 = self.calc_rho0(rvirial=rvirial)
-        rs = rvirial/self.conc
+
+        if np.isscalar(r):
+            return _nfw_menc_scalar(float(r), float(rho0), float(rvirial), float(self.conc.value))
+
+        rs_inv = self.conc/rvirial
         aa = 4.*np.pi*rho0*rvirial**3/self.conc**3
 
-        # For very small r, bb can be negative.
-        bb = np.abs(np.log((rs + r)/rs) - r/(rs + r))
+        # Use log1p to avoid cancellation at small r (bb >= 0 analytically)
+        u = r*rs_inv
+        bb = np.log1p(u) - u/(1.+u)
 
         return aa*bb
 
+    def enclosed_mass_batch(self, r, mvirials):
+        """
+        Enclosed mass at radius `r` for a set of trial virial masses
+
+        Parameters
+        ----------
+        r : float
+            Radius in kpc
+
+        mvirials : array
+            Virial masses at which to evaluate
+
+        Returns
+        -------
+        menc : array
+            Enclosed mass in solar units, with shape `(len(mvirials),)`
+
+        Notes
+        -----
+        For fixed concentration, :math:`M(<r) = M_{\rm vir} f(r c/r_{\rm vir})/f(c)`
+        with :math:`f(u) = \ln(1+u) - u/(1+u)`, so all masses are broadcast at once.
+        """
+        mvirials = np.asarray(mvirials, dtype=float)
+        conc = self.conc.value
+        rvir = self.calc_rvir(mvirial=mvirials)
+        u = r*conc/rvir
+        fc = np.log1p(conc) - conc/(1.+conc)
+
+        return mvirials*(np.log1p(u) - u/(1.+u))/fc
+
     def calc_rho0(self, rvirial=None):
         r"""
         Normalization of the density distribution
@@ -1361,13 +1547,18 @@ class LinearNFW(DarkMatterHalo):
 
         return aa * bb
     
-    def calc_rvir(self):
+    def calc_rvir(self, mvirial=None):
         r"""
         Calculate the virial radius based on virial mass and redshift
 
+        Parameters
+        ----------
+        mvirial : float or array, optional
+            Virial mass(es) to use instead of the current `mvirial` value.
+
         Returns
         -------
-        rvir : float
+        rvir : float or array
             Virial radius
 
         Notes
@@ -1385,7 +1576,8 @@ class LinearNFW(DarkMatterHalo):
         # hz = self.cosmo.H(self.z).value
         # rvir = ((self.mvirial * (g_pc_per_Msun_kmssq * 1e-3) /
         #         (10 * hz * 1e-3) ** 2) ** (1. / 3.))
-        rvir = ((self.mvirial * (g_pc_per_Msun_kmssq * 1e-3) /
-                (10 * self._hz * 1e-3) ** 2) ** (1. / 3.))
+        if mvirial is None:
+            mvirial = self.mvirial.value
+        rvir = _calc_rvir(mvirial, self._hz)
 
         return rvir
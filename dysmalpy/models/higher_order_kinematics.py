@@ -8,6 +8,7 @@ from __future__ import (absolute_import, division, print_function,
 
 # Standard library
 import logging
+import weakref
 
 # Third party imports
 import numpy as np
@@ -39,6 +40,39 @@ logger.setLevel(logging.INFO)
 import warnings
 warnings.filterwarnings("ignore")
 
+def _power(a, n):
+    """
+    a**n, avoiding the exp/log of a general float power for the common
+    simple indices (n = 0.5 or a small positive integer).
+    """
+    n = float(np.squeeze(n))
+    if n == 0.5:
+        return np.sqrt(a)
+    elif n.is_integer() and (0 < n <= 4):
+        result = a
+        for i in range(int(n) - 1):
+            result = result * a
+        return result
+    return a**n
+
+
+def _outside_bicone(r, z, thetain, thetaout):
+    """
+    Mask of positions outside the bicone walls, ie with theta < thetain or
+    theta > thetaout (degrees), where theta = arccos(|z|/r) and theta = 0 at r = 0.
+
+    As cos is monotonic over [0, 90] deg the cuts are applied on
+    |z| vs r*cos(theta), avoiding the arccos.
+    """
+    absz = np.abs(z)
+    ind = np.zeros(np.shape(r), dtype=bool)
+    if thetain > 0:
+        ind |= (absz > r*np.cos(np.pi / 180. * thetain)) | (r == 0)
+    if thetaout < 90.:
+        ind |= absz < r*np.cos(np.pi / 180. * thetaout)
+    return ind
+
+
 class BiconicalOutflow(HigherOrderKinematicsSeparate, _DysmalFittable3DModel):
     r"""
     Model for a biconical outflow
@@ -157,42 +191,88 @@ class BiconicalOutflow(HigherOrderKinematicsSeparate, _DysmalFittable3DModel):
         if self._type == 'outflow':
             self._type = 'higher_order'
 
+    def __getstate__(self):
+        # The coordinate grid cache holds weak references: never pickle it
+        state = self.__dict__.copy()
+        state.pop('_geom_cache', None)
+        return state
+
+    def _get_geom_cache(self, x, y, z):
+        """
+        Radius (and bicone mask) for a coordinate grid.
+
+        The entry for the last grid is kept, with weak references to the
+        coordinate arrays, so `velocity` and `light_profile` calls on the same
+        arrays share it. Grids must not be modified in place between calls.
+        """
+        cache = self.__dict__.get('_geom_cache', None)
+        if cache is not None:
+            xref, yref, zref = cache['refs']
+            if (xref() is x) and (yref() is y) and (zref() is z):
+                return cache
+
+        r = utils.get_geom_r_spherical(x, y, z)
+        cache = {'r': r, 'cone_key': None, 'cone': None}
+        try:
+            cache['refs'] = (weakref.ref(x), weakref.ref(y), weakref.ref(z))
+        except TypeError:
+            # Not arrays (eg floats): nothing to reuse
+            return cache
+
+        if isinstance(r, np.ndarray):
+            r.flags.writeable = False
+        self._geom_cache = cache
+
+        return cache
+
+    def _get_cone_mask(self, geom, z, thetain, thetaout):
+        key = (float(np.squeeze(thetain)), float(np.squeeze(thetaout)))
+        if geom['cone_key'] != key:
+            geom['cone'] = _outside_bicone(geom['r'], z, thetain, thetaout)
+            geom['cone_key'] = key
+        return geom['cone']
+
 
     def evaluate(self, x, y, z, n, vmax, rturn, thetain, dtheta, rend, norm_flux, tau_flux):
         """Evaluate the outflow velocity as a function of position x, y, z"""
 
-        r = np.sqrt(x**2 + y**2 + z**2)
-        theta = np.arccos(np.abs(z)/r)*180./np.pi
-        theta[r == 0] = 0.
+        geom = self._get_geom_cache(x, y, z)
+
+        # Work on flat (contiguous) views; reshape on return
+        shape = np.shape(x)
+        r = np.ravel(geom['r'])
         vel = np.zeros(r.shape)
 
+        # Each radial mask is built once and the power law is only evaluated
+        # on the selected points
         if self.profile_type == 'increase':
 
             amp = vmax/rend**n
-            vel[r <= rend] = amp*r[r <= rend]**n
-            vel[r == 0] = 0
+            ind = (r <= rend) & (r > 0)
+            vel[ind] = amp*_power(r[ind], n)
 
         elif self.profile_type == 'decrease':
 
             amp = -vmax/rend**n
-            vel[r <= rend] = vmax + amp*r[r <= rend]** n
-
+            ind = r <= rend
+            vel[ind] = vmax + amp*_power(r[ind], n)
 
         elif self.profile_type == 'both':
 
-            vel[r <= rturn] = vmax*(r[r <= rturn]/rturn)**n
-            ind = (r > rturn) & (r <= 2*rturn)
-            vel[ind] = vmax*(2 - r[ind]/rturn)**n
+            ind = r <= rturn
+            vel[ind] = vmax*_power(r[ind]/rturn, n)
+            ind = (~ind) & (r <= 2*rturn)
+            vel[ind] = vmax*_power(2 - r[ind]/rturn, n)
 
         elif self.profile_type == 'constant':
 
             vel[r <= rend] = vmax
 
         thetaout = np.min([thetain+dtheta, 90.])
-        ind_zero = (theta < thetain) | (theta > thetaout) | (vel < 0)
+        ind_zero = np.ravel(self._get_cone_mask(geom, z, thetain, thetaout)) | (vel < 0)
         vel[ind_zero] = 0.
 
-        return vel
+        return vel.reshape(shape)
 
     def velocity(self, x, y, z, *args):
         """Return the velocity as a function of x, y, z"""
@@ -202,13 +282,11 @@ class BiconicalOutflow(HigherOrderKinematicsSeparate, _DysmalFittable3DModel):
     def light_profile(self, x, y, z):
         """Evaluate the outflow line flux as a function of position x, y, z"""
 
-        r = np.sqrt(x**2 + y**2 + z**2)
-        theta = np.arccos(np.abs(z) / r) * 180. / np.pi
-        theta[r == 0] = 0.
+        geom = self._get_geom_cache(x, y, z)
+        r = geom['r']
         flux = 10**self.norm_flux*np.exp(-self.tau_flux*(r/self.rend))
         thetaout = np.min([self.thetain + self.dtheta, 90.])
-        ind_zero = ((theta < self.thetain) |
-                    (theta > thetaout) |
+        ind_zero = (self._get_cone_mask(geom, z, self.thetain, thetaout) |
                     (r > self.rend))
         flux[ind_zero] = 1e-16       # To avoid NaNs
 
@@ -235,7 +313,7 @@ class BiconicalOutflow(HigherOrderKinematicsSeparate, _DysmalFittable3DModel):
             For biconical outflows, this is the +rhat direction, in spherical coordinates
             (r,phi,theta).
         """
-        r = np.sqrt(x ** 2 + y ** 2 + z ** 2 )
+        r = utils.get_geom_r_spherical(x, y, z)
 
         vhat_y = y/r
         vhat_z = z/r
@@ -318,7 +396,7 @@ class UnresolvedOutflow(HigherOrderKinematicsSeparate, _DysmalFittable3DModel):
         # The coordinates where the unresolved outflow is placed needs to be
         # an integer pixel so for now we round to nearest integer.
 
-        r = np.sqrt(x**2 + y**2 + z**2)
+        r = utils.get_geom_r_spherical(x, y, z)
         ind_min = r.argmin()
         flux = x*0.
         flux.flat[ind_min] = self.amplitude.value
@@ -368,9 +446,13 @@ class UniformRadialFlow(HigherOrderKinematicsPerturbation, _DysmalFittable3DMode
 
     @staticmethod
     def evaluate(x, y, z, vr):
-        """Evaluate the radial velocity as a function of position x, y, z"""
+        """Evaluate the radial velocity as a function of position x, y, z.
 
-        vel = np.ones(x.shape) * (vr)
+        The constant velocity is returned as a read-only broadcast view
+        with the shape of `x`: copy it before modifying in place.
+        """
+
+        vel = np.broadcast_to(np.asarray(vr, dtype=np.float64), np.shape(x))
 
         return vel
 
@@ -400,7 +482,7 @@ class UniformRadialFlow(HigherOrderKinematicsPerturbation, _DysmalFittable3DMode
             For a uniform radial flow, this is the +rhat direction, in spherical coordinates
             (r,phi,theta).
         """
-        r = np.sqrt(x ** 2 + y ** 2 + z ** 2 )
+        r = utils.get_geom_r_spherical(x, y, z)
 
         vhat_y = y/r
         vhat_z = z/r
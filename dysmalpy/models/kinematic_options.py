@@ -7,16 +7,16 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 # Standard library
+import functools
 import logging
 
 # Third party imports
 import numpy as np
 import scipy.special as scp_spec
-import scipy.interpolate as scp_interp
-import scipy.optimize as scp_opt
 
 # Local imports
 from .baryons import DiskBulge, LinearDiskBulge, Sersic, ExpDisk
+from .utils import njit, _numba_installed
 
 __all__ = ['KinematicOptions']
 
@@ -174,24 +174,20 @@ class KinematicOptions:
             rmax_calc = max(5.* r_ap, rmaxin)
 
             # Wide enough radius range for full calculation -- out to 5*Reff, at least
-            r1d = np.arange(step1d, np.ceil(rmax_calc/step1d)*step1d+ step1d, step1d, dtype=np.float64)
-
-
-            rprime_all_1d = np.zeros(len(r1d))
+            r1d = self._get_adiabatic_r1d(step1d, rmax_calc)
 
             # Calculate vhalo, vbaryon on this 1D radius array [note r is a 3D array]
-            vhalo1d_sq = r1d * 0.
-            vbaryon1d_sq = r1d * 0.
+            # Components add linearly in v^2: collect, then sum once per class
+            halo_vsq_list = []
+            baryon_vsq_list = []
             for cmp in model.mass_components:
                 if model.mass_components[cmp]:
                     mcomp = model.components[cmp]
 
-                    cmpnt_v_sq = mcomp.vcirc_sq(r1d)
-
                     if mcomp._subtype == 'dark_matter':
-                        vhalo1d_sq = vhalo1d_sq + cmpnt_v_sq
+                        halo_vsq_list.append(mcomp.vcirc_sq(r1d))
                     elif mcomp._subtype == 'baryonic':
-                        vbaryon1d_sq = vbaryon1d_sq + cmpnt_v_sq
+                        baryon_vsq_list.append(mcomp.vcirc_sq(r1d))
                     elif mcomp._subtype == 'combined':
                         raise ValueError('Adiabatic contraction cannot be turned on when'
                                          'using a combined baryonic and halo mass model!')
@@ -201,42 +197,41 @@ class KinematicOptions:
                                         " for {} component. Only 'dark_matter'"
                                         " or 'baryonic' accepted.".format(mcomp._subtype, cmp))
 
-            converged = np.zeros(len(r1d), dtype=bool)
-            for i in range(len(r1d)):
-                try:
-                    result = scp_opt.newton(_adiabatic_sq, r1d[i] + 1.,
-                                        args=(r1d[i], vhalo1d_sq, r1d, vbaryon1d_sq[i]),
-                                        maxiter=200)
-                    converged[i] = True
-                except:
-                    result = r1d[i]
-                    converged[i] = False
-
-                # ------------------------------------------------------------------
-                # HACK TO FIX WEIRD AC: If too weird: toss it...
-                if ('adiabatic_contract_modify_small_values' in self.__dict__.keys()):
-                    if self.adiabatic_contract_modify_small_values:
-                        if ((result < 0.) | (result > 5*max(r1d))):
-                            result = r1d[i]
-                            converged[i] = False
-                # ------------------------------------------------------------------
-
-                rprime_all_1d[i] = result
+            vhalo1d_sq = _sum_vsq_components(halo_vsq_list, len(r1d))
+            vbaryon1d_sq = _sum_vsq_components(baryon_vsq_list, len(r1d))
 
-            ###########################
-            vhalo_adi_interp_1d = scp_interp.interp1d(r1d, np.sqrt(vhalo1d_sq), fill_value='extrapolate', kind='linear')
+            # Uniform grid: O(1) interval lookup in the solves
+            dr = _uniform_grid_step(r1d)
 
+            if _numba_installed:
+                # Compiled Newton solve over the whole grid
+                rprime_all_1d, converged = _ac_newton_loop(r1d, np.sqrt(vhalo1d_sq),
+                                                           vbaryon1d_sq, dr)
+            else:
+                # All radii advanced in lockstep with array operations
+                rprime_all_1d, converged = _array_newton_adiabatic(r1d, np.sqrt(vhalo1d_sq),
+                                                                   vbaryon1d_sq, dr)
+
+            # ------------------------------------------------------------------
+            # HACK TO FIX WEIRD AC: If too weird: toss it...
+            if ('adiabatic_contract_modify_small_values' in self.__dict__.keys()):
+                if self.adiabatic_contract_modify_small_values:
+                    weird = ((rprime_all_1d < 0.) | (rprime_all_1d > 5*max(r1d)))
+                    rprime_all_1d[weird] = r1d[weird]
+                    converged[weird] = False
+            # ------------------------------------------------------------------
+
+            ###########################
             # Just calculations:
+            r1d_full = r1d
             if converged.sum() < len(r1d):
                 if converged.sum() >= 0.9 *len(r1d):
                     rprime_all_1d = rprime_all_1d[converged]
                     r1d = r1d[converged]
 
-            vhalo_adi_1d = vhalo_adi_interp_1d(rprime_all_1d)
+            vhalo_adi_1d = _interp_linear_extrap(rprime_all_1d, r1d_full, np.sqrt(vhalo1d_sq))
 
-            vhalo_adi_interp_map_3d = scp_interp.interp1d(r1d, vhalo_adi_1d, fill_value='extrapolate', kind='linear')
-
-            vhalo_adi = vhalo_adi_interp_map_3d(r)
+            vhalo_adi = _interp_linear_extrap(r, r1d, vhalo_adi_1d)
 
             vel_sq = vhalo_adi ** 2 + vbaryon_sq
         else:
@@ -262,6 +257,19 @@ class KinematicOptions:
                 return vel
 
 
+    def _get_adiabatic_r1d(self, step1d, rmax_calc):
+        # The AC radius grid rarely changes between calls (eg during fitting):
+        # reuse it as long as (step1d, rmax_calc) are unchanged.
+        cache = self.__dict__.get('_r1d_cache', None)
+        if (cache is not None) and (cache[0] == step1d) and (cache[1] == rmax_calc):
+            return cache[2]
+
+        r1d = np.arange(step1d, np.ceil(rmax_calc/step1d)*step1d+ step1d, step1d, dtype=np.float64)
+        r1d.flags.writeable = False
+        self._r1d_cache = (step1d, rmax_calc, r1d)
+
+        return r1d
+
     def apply_pressure_support(self, r, model, vel_sq, tracer=None):
         """
         Function to apply asymmetric drift correction
@@ -293,14 +301,8 @@ class KinematicOptions:
             vel_asymm_drift_sq = self.get_asymm_drift_profile(r, model, tracer=tracer)
             vel_squared = vel_sq - vel_asymm_drift_sq
 
-            # if array:
-            try:
-                vel_squared[vel_squared < 0] = 0.
-            except:
-                # if float single value:
-                if vel_squared < 0:
-                    vel_squared = 0.
-            #vel = np.sqrt(vel_squared)
+            # Floor at zero; works for both floats and arrays
+            vel_squared = np.maximum(vel_squared, 0.)
 
         return vel_squared
 
@@ -334,14 +336,8 @@ class KinematicOptions:
             vel_asymm_drift_sq = self.get_asymm_drift_profile(r, model, tracer=tracer)
             vel_squared = vel_sq + vel_asymm_drift_sq
 
-            # if array:
-            try:
-                vel_squared[vel_squared < 0] = 0.
-            except:
-                # if float single value:
-                if (vel_squared < 0):
-                    vel_squared = 0.
-            #vel = np.sqrt(vel_squared)
+            # Floor at zero; works for both floats and arrays
+            vel_squared = np.maximum(vel_squared, 0.)
 
         return vel_squared
 
@@ -392,7 +388,7 @@ class KinematicOptions:
         elif self.pressure_support_type == 2:
             # Modified derivation that takes into account n_disk / n
             pn = self.get_pressure_support_param(model, param='n')
-            bn = scp_spec.gammaincinv(2. * pn, 0.5)
+            bn = _bn_cached(float(pn))
 
             vel_asymm_drift_sq = 2. * (bn/pn) * np.power((r/pre), 1./pn) * sigma**2
 
@@ -433,15 +429,9 @@ class KinematicOptions:
 
         if self.__dict__[paramkey] is None:
             p_val = None
-            for cmp in model.mass_components:
-                if model.mass_components[cmp]:
-                    mcomp = model.components[cmp]
-                    if (mcomp._subtype == 'baryonic') | (mcomp._subtype == 'combined'):
-                        if (isinstance(mcomp, DiskBulge)) | (isinstance(mcomp, LinearDiskBulge)):
-                            p_val = mcomp.__getattribute__('{}_disk'.format(p_altname)).value
-                        elif (isinstance(mcomp, Sersic)) | (isinstance(mcomp, ExpDisk)):
-                            p_val = mcomp.__getattribute__('{}'.format(p_altname)).value
-                        break
+            mcomp, pname = self._get_pressure_support_source(model, p_altname)
+            if mcomp is not None:
+                p_val = mcomp.__getattribute__(pname).value
 
             if p_val is None:
                 if param == 're':
@@ -459,27 +449,187 @@ class KinematicOptions:
 
         return p_val
 
+    def _get_pressure_support_source(self, model, p_altname):
+        # Which component / parameter supplies the pressure support re or n only
+        # depends on the model composition: cache the lookup (the parameter
+        # value itself is always read from the component).
+        key = (id(model), tuple(model.mass_components.items()))
+        cache = self.__dict__.setdefault('_psupport_cache', {})
+        if (p_altname in cache) and (cache[p_altname][0] == key):
+            mcomp = cache[p_altname][1][0]
+            if (mcomp is None) or (model.components.get(mcomp.name, None) is mcomp):
+                return cache[p_altname][1]
+
+        source = (None, None)
+        for cmp in model.mass_components:
+            if model.mass_components[cmp]:
+                mcomp = model.components[cmp]
+                if mcomp._subtype in ('baryonic', 'combined'):
+                    if isinstance(mcomp, (DiskBulge, LinearDiskBulge)):
+                        source = (mcomp, '{}_disk'.format(p_altname))
+                    elif isinstance(mcomp, (Sersic, ExpDisk)):
+                        source = (mcomp, p_altname)
+                    break
+
+        cache[p_altname] = (key, source)
+
+        return source
+
+
+@functools.lru_cache(maxsize=128)
+def _bn_cached(n):
+    # Sersic b_n; only changes with the Sersic index, not with r
+    return scp_spec.gammaincinv(2. * n, 0.5)
+
+def _sum_vsq_components(vsq_list, npts):
+    if len(vsq_list) == 0:
+        return np.zeros(npts, dtype=np.float64)
+    return np.sum(np.stack(vsq_list), axis=0)
+
+def _interp_linear_extrap(xnew, x, y):
+    # np.interp, plus the linear extrapolation beyond the ends of x of
+    # interp1d(x, y, fill_value='extrapolate')
+    xnew = np.asarray(xnew, dtype=np.float64)
+    ynew = np.asarray(np.interp(xnew, x, y))
+    lo = xnew < x[0]
+    if lo.any():
+        ynew[lo] = (y[1] - y[0]) / (x[1] - x[0]) * (xnew[lo] - x[0]) + y[0]
+    hi = xnew > x[-1]
+    if hi.any():
+        ynew[hi] = (y[-1] - y[-2]) / (x[-1] - x[-2]) * (xnew[hi] - x[-2]) + y[-2]
+    return ynew
+
+def _uniform_grid_step(x):
+    # Step of an equispaced grid, or 0 if the grid is not uniform
+    dx = x[1] - x[0]
+    if (dx > 0.) and np.allclose(np.diff(x), dx, rtol=1.e-6, atol=0.):
+        return dx
+    return 0.
+
+def _adiabatic_sq_arr(rprime, r_adi, adia_x_dm, adia_v_dm, adia_v_disk_sq, dx=0.):
+    # Array version of `_adiabatic_sq_nb`
+    clamped = rprime < adia_x_dm[1]
+    rprime = np.where(rprime <= 0., 0.1, rprime)
+    rprime = np.maximum(rprime, adia_x_dm[1])
+
+    if dx > 0.:
+        j = np.clip(((rprime - adia_x_dm[0]) / dx).astype(np.int64) + 1,
+                    1, adia_x_dm.shape[0] - 1)
+    else:
+        j = np.clip(np.searchsorted(adia_x_dm, rprime), 1, adia_x_dm.shape[0] - 1)
+    slope = (adia_v_dm[j] - adia_v_dm[j-1]) / (adia_x_dm[j] - adia_x_dm[j-1])
+    v_dm = slope * (rprime - adia_x_dm[j-1]) + adia_v_dm[j-1]
+
+    term = r_adi * ((r_adi*adia_v_disk_sq) / (rprime*v_dm**2))
+    result = r_adi + term - rprime
+    deriv = np.where(clamped, 0., -term / rprime * (1. + 2.*rprime*slope/v_dm) - 1.)
+
+    return result, deriv
+
+def _array_newton_adiabatic(r1d, vhalo1d, vbaryon1d_sq, dr=0., maxiter=200, tol=1.48e-8):
+    """
+    NumPy counterpart of `_ac_newton_loop`: all radii are iterated together,
+    with finished entries masked out, using the same Newton steps and
+    stopping rule as the per-radius solve. As the radii are solved
+    simultaneously there is no warm start: all start from `r1d + 1`.
+    """
+    rprime_all = np.array(r1d, dtype=np.float64)
+    converged = np.zeros(r1d.shape[0], dtype=bool)
 
-def _adiabatic(rprime, r_adi, adia_v_dm, adia_x_dm, adia_v_disk):
-    if rprime <= 0.:
-        rprime = 0.1
-    if rprime < adia_x_dm[1]:
-        rprime = adia_x_dm[1]
-    rprime_interp = scp_interp.interp1d(adia_x_dm, adia_v_dm,
-                                        fill_value="extrapolate")
-    result = (r_adi + r_adi * ((r_adi*adia_v_disk**2) /
-                               (rprime*(rprime_interp(rprime))**2)) - rprime)
+    p = r1d + 1.
+    active = np.arange(r1d.shape[0])
+    with np.errstate(all='ignore'):
+        for itr in range(maxiter):
+            if active.size == 0:
+                break
+            g, dg = _adiabatic_sq_arr(p, r1d[active], r1d, vhalo1d, vbaryon1d_sq[active], dr)
+
+            # Zero derivative: cannot step, not converged
+            ok = (dg != 0.)
+            step = g / dg
+            p_new = p - step
+            done = ok & (np.abs(step) < tol * np.maximum(1., np.abs(p_new)))
 
-    return result
+            rprime_all[active[done]] = p_new[done]
+            converged[active[done]] = True
 
-def _adiabatic_sq(rprime, r_adi, adia_v_dm_sq, adia_x_dm, adia_v_disk_sq):
+            cont = ok & ~done
+            active = active[cont]
+            p = p_new[cont]
+
+    return rprime_all, converged
+
+
+@njit(cache=True, error_model='numpy')
+def _adiabatic_sq_nb(rprime, r_adi, adia_x_dm, adia_v_dm, adia_v_disk_sq, dx=0.):
+    """
+    AC equation for the contracted radius `rprime` of the shell at `r_adi`,
+    and its derivative with respect to `rprime`. v_DM is linearly interpolated
+    (and extrapolated) on (`adia_x_dm`, `adia_v_dm`); if `dx` > 0 the grid is
+    taken as uniform with step `dx` and the interval is found directly.
+    """
+    clamped = False
     if rprime <= 0.:
         rprime = 0.1
+        clamped = True
     if rprime < adia_x_dm[1]:
         rprime = adia_x_dm[1]
-    rprime_interp = scp_interp.interp1d(adia_x_dm, np.sqrt(adia_v_dm_sq),
-                                        fill_value="extrapolate")
-    result = (r_adi + r_adi * ((r_adi*adia_v_disk_sq) /
-                               (rprime*(rprime_interp(rprime))**2)) - rprime)
+        clamped = True
+
+    if dx > 0.:
+        j = int((rprime - adia_x_dm[0]) / dx) + 1
+    else:
+        j = np.searchsorted(adia_x_dm, rprime)
+    if j < 1:
+        j = 1
+    elif j > adia_x_dm.shape[0] - 1:
+        j = adia_x_dm.shape[0] - 1
+    slope = (adia_v_dm[j] - adia_v_dm[j-1]) / (adia_x_dm[j] - adia_x_dm[j-1])
+    v_dm = slope * (rprime - adia_x_dm[j-1]) + adia_v_dm[j-1]
+
+    term = r_adi * ((r_adi*adia_v_disk_sq) / (rprime*v_dm**2))
+    result = r_adi + term - rprime
+    if clamped:
+        deriv = 0.
+    else:
+        deriv = -term / rprime * (1. + 2.*rprime*slope/v_dm) - 1.
+
+    return result, deriv
+
+@njit(cache=True, error_model='numpy')
+def _ac_newton_loop(r1d, vhalo1d, vbaryon1d_sq, dr=0., maxiter=200, tol=1.48e-8):
+    """
+    Solve `_adiabatic_sq_nb` = 0 for every radius in `r1d` with Newton-Raphson.
+    Iteration stops on the step size, `|dr| < tol * max(1, |r|)`.
+    Unconverged entries are set to `r1d[i]`.
 
-    return result
+    rprime(r) is monotonic, so each solve is warm-started from the previous
+    root shifted by the grid step; after a failure (or for i = 0) the start
+    is `r1d[i] + 1`.
+    """
+    npts = r1d.shape[0]
+    rprime_all = np.empty(npts)
+    converged = np.zeros(npts, dtype=np.bool_)
+    for i in range(npts):
+        r_adi = r1d[i]
+        vdisk_sq = vbaryon1d_sq[i]
+
+        result = r_adi
+        if (i > 0) and converged[i-1]:
+            p = rprime_all[i-1] + (r_adi - r1d[i-1])
+        else:
+            p = r_adi + 1.
+        for itr in range(maxiter):
+            g, dg = _adiabatic_sq_nb(p, r_adi, r1d, vhalo1d, vdisk_sq, dr)
+            if dg == 0.:
+                break
+            step = g / dg
+            p = p - step
+            if abs(step) < tol * max(1., abs(p)):
+                result = p
+                converged[i] = True
+                break
+
+        rprime_all[i] = result
+
+    return rprime_all, converged
@@ -8,13 +8,15 @@ from __future__ import (absolute_import, division, print_function,
 
 # Standard library
 import logging
+import math
 
 # Third party imports
 import numpy as np
 
 # Local imports
 from .base import LightModel, _DysmalFittable1DModel, _DysmalFittable3DModel, \
-                  truncate_sersic_mr, sersic_mr, _I0_gaussring
+                  truncate_sersic_mr, sersic_mr, _I0_gaussring, \
+                  _sersic_bn_amp
 from dysmalpy.parameters import DysmalParameter
 
 try:
@@ -27,12 +29,104 @@ __all__ = ['LightTruncateSersic', 'LightGaussianRing', 'LightClump',
 
 
 # LOGGER SETTINGS
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('DysmalPy')
 logger.setLevel(logging.INFO)
 
-import warnings
-warnings.filterwarnings("ignore")
+# Floating point type used for the grid evaluation of the light profiles.
+# Set to np.float32 to halve the memory traffic, at ~1e-7 relative precision.
+LIGHT_DTYPE = np.float64
+
+# Number of threads used to evaluate the light components of a model cube
+# concurrently. Keep at 1 when fitting with a multiprocessing pool.
+LIGHT_NTHREADS = 1
+
+
+def _scalar(par):
+    """
+    Scalar parameter value (float, or 0-d / size-1 array) as a Python float.
+    """
+    if np.ndim(par) > 0:
+        par = np.squeeze(par)
+    return float(par)
+
+
+def _clump_sersic(x, y, xc, yc, amp, bn, r_eff, invn, dtype=np.float64):
+    """
+    amp * exp(-bn * (r/r_eff)**invn), with r the distance from (xc, yc).
+
+    Evaluated in place in a single buffer, and with (r/r_eff)**invn taken as
+    (r^2/r_eff^2)**(invn/2) to skip the square root.
+    """
+    if (np.ndim(x) == 0) or (np.shape(x) != np.shape(y)):
+        r = np.hypot(x-xc, y-yc)
+        return amp * np.exp(-bn * (r / r_eff) ** invn)
+
+    arr = np.subtract(x, xc, dtype=dtype)
+    arr *= arr
+    tmp = np.subtract(y, yc, dtype=dtype)
+    tmp *= tmp
+    arr += tmp
+    del tmp
+    arr *= 1. / (r_eff * r_eff)
+    np.power(arr, 0.5 * invn, out=arr)
+    arr *= -bn
+    np.exp(arr, out=arr)
+    arr *= amp
+    return arr
+
+
+def _gauss_ring(r, R_peak, sigma_R, I0, dtype=np.float64):
+    """
+    Gaussian ring I0*exp(-(r-R_peak)**2/(2*sigma_R**2)), evaluated in place in
+    a single buffer.
+    """
+    arr = np.subtract(r, R_peak, dtype=dtype)
+    arr *= arr
+    arr *= -1. / (2. * sigma_R * sigma_R)
+    np.exp(arr, out=arr)
+    arr *= I0
+    return arr
+
+
+def _gring_azim(x, y, R_peak, sigma_R, I0, phi_rad, contrast, gamma,
+                dtype=np.float64):
+    """
+    Azimuthally modulated Gaussian ring, evaluated with in-place passes over
+    two buffers.
+
+    The polar angle is taken from arctan2: it differs from
+    `utils.get_geom_phi_rad_polar` only by multiples of 2 pi, which leave
+    |sin(0.5*(phi_gal - phi))| unchanged.
+    """
+    x = np.asarray(x, dtype=dtype)
+    y = np.asarray(y, dtype=dtype)
+    arr = np.hypot(x, y)
+    arr -= R_peak
+    arr *= arr
+    arr *= -1. / (2. * sigma_R * sigma_R)
+    np.exp(arr, out=arr)
+    arr *= I0
+    if contrast == 1.:
+        # No azimuthal modulation
+        return arr
+
+    ang = np.arctan2(y, x)
+    ang -= phi_rad
+    ang *= 0.5
+    np.sin(ang, out=ang)
+    np.abs(ang, out=ang)
+    # Avoid the general pow for the simple exponents
+    invgamma = 1. / gamma
+    if invgamma == 2.:
+        ang *= ang
+    elif invgamma == 0.5:
+        np.sqrt(ang, out=ang)
+    elif invgamma != 1.:
+        np.power(ang, invgamma, out=ang)
+    ang *= -(1. - contrast)
+    ang += 1.
+    arr *= ang
+    return arr
 
 
 class LightTruncateSersic(LightModel, _DysmalFittable1DModel):
@@ -119,7 +213,8 @@ class LightTruncateSersic(LightModel, _DysmalFittable1DModel):
         """
         Sersic light surface density. Same as self.light_profile
         """
-        return truncate_sersic_mr(r, L_tot, n, r_eff, r_inner, r_outer)
+        return truncate_sersic_mr(r, L_tot, n, r_eff, r_inner, r_outer,
+                                  dtype=LIGHT_DTYPE)
 
     def light_profile(self, r):
         """
@@ -135,7 +230,9 @@ class LightTruncateSersic(LightModel, _DysmalFittable1DModel):
         light : float or array
             Relative line flux as a function of radius
         """
-        return self.evaluate(r, self.L_tot, self.r_eff, self.n, self.r_inner, self.r_outer)
+        # Pass the parameter values, skipping the Parameter arithmetic overhead
+        return self.evaluate(r, self.L_tot.value, self.r_eff.value, self.n.value,
+                             self.r_inner.value, self.r_outer.value)
 
 
 class LightGaussianRing(LightModel, _DysmalFittable1DModel):
@@ -188,6 +285,9 @@ class LightGaussianRing(LightModel, _DysmalFittable1DModel):
         """
         sigma_R = FWHM/ (2.*np.sqrt(2.*np.log(2.)))
         I0 = _I0_gaussring(R_peak, sigma_R, L_tot)
+        if np.ndim(r) > 0:
+            return _gauss_ring(r, _scalar(R_peak), _scalar(sigma_R), _scalar(I0),
+                               dtype=LIGHT_DTYPE)
         return I0*np.exp(-(r-R_peak)**2/(2.*sigma_R**2))
 
     def light_profile(self, r):
@@ -204,7 +304,7 @@ class LightGaussianRing(LightModel, _DysmalFittable1DModel):
         light : float or array
             Relative line flux as a function of radius
         """
-        return self.evaluate(r, self.R_peak, self.FWHM, self.L_tot)
+        return self.evaluate(r, self.R_peak.value, self.FWHM.value, self.L_tot.value)
 
 
 class LightClump(LightModel, _DysmalFittable3DModel):
@@ -272,12 +372,18 @@ class LightClump(LightModel, _DysmalFittable3DModel):
         """
         Light profile of the clump
         """
-        phi_rad = np.pi / 180. * phi
+        phi_rad = math.radians(_scalar(phi))
+        r_center = _scalar(r_center)
+
+        # Sersic constants, as in `sersic_mr`
+        n = _scalar(n)
+        r_eff = _scalar(r_eff)
+        bn, amp = _sersic_bn_amp(n, r_eff, _scalar(L_tot))
 
         # INGORE THETA, and assume clump centered at midplane:
-        r = np.sqrt( (x-r_center*np.cos(phi_rad))**2 + \
-                     (y-r_center*np.sin(phi_rad))**2 )
-        return sersic_mr(r, L_tot, n, r_eff)
+        return _clump_sersic(x, y, r_center*math.cos(phi_rad),
+                             r_center*math.sin(phi_rad), amp, bn, r_eff, 1. / n,
+                             dtype=LIGHT_DTYPE)
 
     def light_profile(self, x, y, z):
         """
@@ -293,8 +399,9 @@ class LightClump(LightModel, _DysmalFittable3DModel):
         light : float or array
             Relative line flux as a function of radius
         """
-        return self.evaluate(x, y, z, self.L_tot, self.r_eff, self.n,
-                             self.r_center, self.phi, self.theta)
+        return self.evaluate(x, y, z, self.L_tot.value, self.r_eff.value,
+                             self.n.value, self.r_center.value, self.phi.value,
+                             self.theta.value)
 
 
 class LightGaussianRingAzimuthal(LightModel, _DysmalFittable3DModel):
@@ -362,12 +469,20 @@ class LightGaussianRingAzimuthal(LightModel, _DysmalFittable3DModel):
         """
         sigma_R = FWHM / (2.*np.sqrt(2.*np.log(2.)))
         I0 = _I0_gaussring(R_peak, sigma_R, L_tot)
-        r = np.sqrt( x ** 2 + y ** 2 )
-        gaus_symm = I0*np.exp(-(r-R_peak)**2/(2.*sigma_R**2))
 
         # Assume ring is in midplane
-        phi_rad = phi * np.pi / 180.
-        phi_gal_rad = utils.get_geom_phi_rad_polar(x, y)
+        phi_rad = math.radians(_scalar(phi))
+
+        if (np.ndim(x) > 0) and (np.shape(x) == np.shape(y)):
+            return _gring_azim(x, y, _scalar(R_peak), _scalar(sigma_R), _scalar(I0),
+                               phi_rad, _scalar(contrast), _scalar(gamma),
+                               dtype=LIGHT_DTYPE)
+
+        r = np.hypot(x, y)
+        gaus_symm = I0*np.exp(-(r-R_peak)**2/(2.*sigma_R**2))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # y/R is 0/0 at the origin, which get_geom_phi_rad_polar resets to 0
+            phi_gal_rad = utils.get_geom_phi_rad_polar(x, y)
 
 
         asymm_fac = 1. - (1.-contrast)*np.power(np.abs(np.sin(0.5 * (phi_gal_rad-phi_rad))), 1./gamma)
@@ -389,5 +504,6 @@ class LightGaussianRingAzimuthal(LightModel, _DysmalFittable3DModel):
         light : float or array
             Relative line flux as a function of radius
         """
-        return self.evaluate(x, y, z, self.R_peak, self.FWHM, self.L_tot,
-                    self.phi, self.contrast, self.gamma)
+        return self.evaluate(x, y, z, self.R_peak.value, self.FWHM.value,
+                             self.L_tot.value, self.phi.value,
+                             self.contrast.value, self.gamma.value)
@@ -16,6 +16,7 @@ from collections import OrderedDict
 from .base import _DysmalModel, menc_from_vcirc
 from .kinematic_options import KinematicOptions
 from .dimming import ConstantDimming
+from . import light_distributions
 
 try:
    import dysmalpy.models.utils as model_utils
@@ -27,8 +28,12 @@ except:
 import numpy as np
 import astropy.constants as apy_con
 import astropy.units as u
-import pyximport; pyximport.install()
-from . import cutils
+try:
+    import pyximport; pyximport.install()
+    from . import cutils
+except ImportError:
+    # No Cython or no C compiler: use the Numba versions of the cube functions
+    from . import cutils_numba as cutils
 
 
 __all__ = ['ModelSet']
@@ -42,6 +47,15 @@ logger.setLevel(logging.INFO)
 import warnings
 warnings.filterwarnings("ignore")
 
+if (cutils.__name__.endswith('cutils_numba')) and (not model_utils._numba_installed):
+    logger.warning("Neither the Cython cutils module nor numba is available: "
+                   "cube population falls back to pure Python and will be very slow. "
+                   "Install a C compiler and Cython, or numba (pip install dysmalpy[accel]).")
+
+# Number of OpenMP threads used by cutils.populate_cube. Keep at 1 when
+# fitting with a multiprocessing pool (one process per core already).
+CUBE_NTHREADS = 1
+
 def _make_cube_ai(model, xgal, ygal, zgal, n_wholepix_z_min = 3,
             pixscale=None, oversample=None, dscale=None,
             maxr=None, maxr_y=None):
@@ -1465,19 +1479,37 @@ class ModelSet:
             # self.light_components SHOULD NOT include
             #    higher-order kin comps with own light profiles.
 
+            # The kpc grids and the z profile are shared by all components,
+            #    so compute them once and apply zscale to the summed light.
             tracer_lcomps = model_utils.get_light_components_by_tracer(self, obs.tracer)
+            rgal_kpc = xgal_kpc = ygal_kpc = zgal_kpc = None
+            light_calls = []
             for cmp in tracer_lcomps:
                 if (self.light_components[cmp]):
                     lcomp = self.components[cmp]
-                    zscale = self.zprofile(zgal*to_kpc)
+                    if zgal_kpc is None:
+                        zgal_kpc = zgal*to_kpc
                     # Differentiate between axisymmetric and non-axisymmetric light components:
                     if lcomp._axisymmetric:
                         # Axisymmetric cases:
-                        flux_mass += lcomp.light_profile(rgal*to_kpc) * zscale
+                        if rgal_kpc is None:
+                            rgal_kpc = rgal*to_kpc
+                        light_calls.append((lcomp.light_profile, (rgal_kpc,)))
                     else:
                         # Non-axisymmetric cases:
                         ## ASSUME IT'S ALL IN THE MIDPLANE, so also apply zscale
-                        flux_mass +=  lcomp.light_profile(xgal*to_kpc, ygal*to_kpc, zgal*to_kpc) * zscale
+                        if xgal_kpc is None:
+                            xgal_kpc = xgal*to_kpc
+                            ygal_kpc = ygal*to_kpc
+                        light_calls.append((lcomp.light_profile,
+                                            (xgal_kpc, ygal_kpc, zgal_kpc)))
+            for light in model_utils.evaluate_light_profiles(light_calls,
+                            nthreads=light_distributions.LIGHT_NTHREADS):
+                flux_mass += light
+            light_calls = light = None
+            if zgal_kpc is not None:
+                flux_mass *= self.zprofile(zgal_kpc)
+            rgal_kpc = xgal_kpc = ygal_kpc = zgal_kpc = None
 
 
             # Apply extinction if a component exists
@@ -1502,7 +1534,8 @@ class ModelSet:
                     cube_final += cutils.populate_cube_ais(flux_mass, vobs_mass, sigmar, vx, ai)
                 else:
                     # Do complete cube propogation calculation
-                    cube_final += cutils.populate_cube(flux_mass, vobs_mass, sigmar, vx)
+                    cube_final += cutils.populate_cube(flux_mass, vobs_mass, sigmar, vx,
+                                                       num_threads=CUBE_NTHREADS)
                 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
             elif transform_method.lower().strip() == 'rotate':
@@ -1708,7 +1741,8 @@ class ModelSet:
                     #######
 
                     # Do complete cube propogation calculation
-                    cube_final += cutils.populate_cube(flux_mass_transf, vobs_mass_transf, sigmar_transf, vx)
+                    cube_final += cutils.populate_cube(flux_mass_transf, vobs_mass_transf, sigmar_transf, vx,
+                                                       num_threads=CUBE_NTHREADS)
                 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
             # Remove the oversample from the geometry xyshift
@@ -1762,9 +1796,13 @@ class ModelSet:
                 xhiord, yhiord, zhiord, xsky, ysky, zsky = _get_xyz_sky_gal(hiord_geom, sh,
                                 xcenter_samp, ycenter_samp, (nz_sky_samp - 1) / 2.)
 
-                # Profiles need positions in kpc
-                v_hiord = comp.velocity(xhiord*to_kpc, yhiord*to_kpc, zhiord*to_kpc)
-                f_hiord = comp.light_profile(xhiord*to_kpc, yhiord*to_kpc, zhiord*to_kpc)
+                # Profiles need positions in kpc: the same arrays are passed to
+                # each profile, so components can reuse per-grid calculations
+                xhiord_kpc = xhiord*to_kpc
+                yhiord_kpc = yhiord*to_kpc
+                zhiord_kpc = zhiord*to_kpc
+                v_hiord = comp.velocity(xhiord_kpc, yhiord_kpc, zhiord_kpc)
+                f_hiord = comp.light_profile(xhiord_kpc, yhiord_kpc, zhiord_kpc)
 
                 # Apply extinction if it exists
                 if self.extinction is not None:
@@ -1786,9 +1824,10 @@ class ModelSet:
                     sigma_hiord = self.higher_order_dispersions[comp.name](np.sqrt(xhiord**2 + yhiord**2 + zhiord**2)) # r_hiord
                 else:
                     # The higher-order term MUST have its own defined dispersion profile:
-                    sigma_hiord = comp.dispersion_profile(xhiord*to_kpc, yhiord*to_kpc, zhiord*to_kpc)
+                    sigma_hiord = comp.dispersion_profile(xhiord_kpc, yhiord_kpc, zhiord_kpc)
 
-                cube_final += cutils.populate_cube(f_hiord, v_hiord_LOS, sigma_hiord, vx)
+                cube_final += cutils.populate_cube(f_hiord, v_hiord_LOS, sigma_hiord, vx,
+                                                   num_threads=CUBE_NTHREADS)
 
                 # Remove the oversample from the geometry xyshift
                 hiord_geom.xshift = hiord_geom.xshift.value / oversample
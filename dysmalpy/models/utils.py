@@ -7,13 +7,30 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 # Standard library
+import concurrent.futures
 import logging
+import math
 
 from collections import OrderedDict
 
 # Third party imports
 import numpy as np
 
+try:
+    from numba import njit, vectorize
+    _numba_installed = True
+except ImportError:
+    _numba_installed = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for `numba.njit` if numba is not installed: returns the plain Python function."""
+        if (len(args) == 1) and callable(args[0]) and (len(kwargs) == 0):
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
 # Local imports
 from dysmalpy.parameters import DysmalParameter
 
@@ -49,6 +66,48 @@ def get_light_components_by_tracer(model_set, tracer):
 
 
 
+if _numba_installed:
+    @vectorize(['float64(float64, float64, float64)'], target='parallel', cache=True)
+    def _r_spherical(x, y, z):
+        return math.sqrt(x*x + y*y + z*z)
+
+def evaluate_light_profiles(calls, nthreads=1):
+    """
+    Evaluate light profiles given as (light_profile, args) pairs, yielding
+    the results in the input order.
+
+    If nthreads > 1 and there is more than one profile, they are evaluated in
+    a thread pool (the array math releases the GIL).
+    """
+    if (nthreads > 1) and (len(calls) > 1):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=nthreads) as executor:
+            for light in executor.map(lambda call: call[0](*call[1]), calls):
+                yield light
+    else:
+        for func, args in calls:
+            yield func(*args)
+
+def get_geom_r_spherical(x, y, z):
+    """
+    Calculate spherical radius r = sqrt(x^2 + y^2 + z^2).
+
+    Uses a single fused pass if numba is installed; otherwise the squares are
+    accumulated into one buffer, limiting the number of cube-sized temporaries.
+    """
+    if _numba_installed:
+        return _r_spherical(x, y, z)
+
+    x, y, z = np.asarray(x), np.asarray(y), np.asarray(z)
+    if (x.ndim == 0) or not (x.shape == y.shape == z.shape):
+        return np.sqrt(x*x + y*y + z*z)
+
+    r = x*x
+    tmp = y*y
+    r += tmp
+    np.multiply(z, z, out=tmp)
+    r += tmp
+    return np.sqrt(r, out=r)
+
 def get_geom_phi_rad_polar(x, y):
     """
     Calculate polar angle phi from x, y.
@@ -9,12 +9,14 @@ from __future__ import (absolute_import, division, print_function,
 # Standard library
 import abc
 import logging
+import math
 
 # Third party imports
 import numpy as np
 
 # Local imports
 from .base import _DysmalFittable1DModel
+from .utils import _numba_installed
 from dysmalpy.parameters import DysmalParameter
 
 __all__ = ['ZHeightGauss', 'ZHeightExp']
@@ -29,6 +31,26 @@ import warnings
 warnings.filterwarnings("ignore")
 
 
+# Fused, multithreaded kernels for the per-voxel z-profile evaluation:
+if _numba_installed:
+    from numba import vectorize
+
+    @vectorize(['float64(float64, float64)'], target='parallel', fastmath=True, cache=True)
+    def _zgauss(z, sigmaz):
+        zs = z / sigmaz
+        return math.exp(-0.5*zs*zs)
+
+    @vectorize(['float64(float64, float64)'], target='parallel', fastmath=True, cache=True)
+    def _zexp(z, hz):
+        return math.exp(-z/hz)
+else:
+    def _zgauss(z, sigmaz):
+        return np.exp(-0.5*(z/sigmaz)**2)
+
+    def _zexp(z, hz):
+        return np.exp(-z/hz)
+
+
 # ******* Z-Height Profiles ***************
 class ZHeightProfile(_DysmalFittable1DModel):
     """Base object for flux profiles in the z-direction"""
@@ -65,7 +87,7 @@ class ZHeightGauss(ZHeightProfile):
 
     @staticmethod
     def evaluate(z, sigmaz):
-        return np.exp(-0.5*(z/sigmaz)**2)
+        return _zgauss(z, sigmaz)
 
     @property
     def z_scalelength(self):
@@ -96,7 +118,7 @@ class ZHeightExp(ZHeightProfile):
 
     @staticmethod
     def evaluate(z, hz):
-        return np.exp(-z/hz)
+        return _zexp(z, hz)
 
     @property
     def z_scalelength(self):
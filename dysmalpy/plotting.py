@@ -38,6 +38,7 @@ from astropy.wcs import WCS
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
 from matplotlib.ticker import MultipleLocator
+from matplotlib.collections import LineCollection
 
 import matplotlib.colors as mplcolors
 from mpl_toolkits.axes_grid1 import ImageGrid, AxesGrid
@@ -88,7 +89,20 @@ except:
     cmap_rdbu_r = mpl.colormaps["RdBu_r_stretch"]
     cmap_seismic = cm.seismic
 
+# Map and residual colormaps with white bad pixels, built once and shared
+#   by the 2D map plots (the base colormaps above are left unmodified):
+_cmap_maps = copy.copy(cmap_spectral_r)
+_cmap_maps.set_bad(color='white')
+_cmap_resid = copy.copy(cmap_rdbu_r)
+_cmap_resid.set_bad(color='white')
+_cmap_resid_clip = copy.copy(_cmap_resid)
+_cmap_resid_clip.set_over(color='magenta')
+_cmap_resid_clip.set_under(color='blueviolet')
+
     
+# Resolution of the saved figures. Lower (e.g. 150) for faster, smaller
+#   raster output of diagnostic plots.
+SAVEFIG_DPI = 300
 
 # Default settings for contours on 2D maps:
 _kwargs_contour_defaults = { 'colors_cont': 'black',
@@ -215,22 +229,35 @@ def plot_trace_mcmc(mcmcResults, fileout=None, overwrite=False):
     alphaTrace = 0.8
     lwTrace = 1.5
     trace_inds = np.random.randint(0,nWalkers, size=nTraceWalkers)
-    trace_colors = []
-    for i in range(nTraceWalkers):
-        trace_colors.append(cmap(1./float(nTraceWalkers)*i))
+    trace_colors = cmap(np.linspace(0., 1., nTraceWalkers, endpoint=False))
 
     norm_inds = np.setdiff1d(range(nWalkers), trace_inds)
 
+    # Draw the walkers of each panel as one LineCollection, with
+    #   the segments laid out as (walker, step, [x,y]):
+    #   (new arrays per panel, as the collection paths keep views of them)
+    chain = mcmcResults.sampler_results['chain']
+    steps = np.arange(chain.shape[1])
+
+    # Select the walker subsets once, rather than per parameter:
+    norm_chain = chain[norm_inds]
+    trace_chain = chain[trace_inds]
 
     for k in range(nRows):
         axes.append(plt.subplot(gs[k,0]))
 
-        axes[k].plot(mcmcResults.sampler_results['chain'][norm_inds,:,k].T, '-', 
-                     color='black', alpha=alpha, rasterized=True)
+        segs_norm = np.empty((len(norm_inds), len(steps), 2))
+        segs_norm[..., 0] = steps
+        segs_norm[..., 1] = norm_chain[..., k]
+        axes[k].add_collection(LineCollection(segs_norm, colors='black',
+                               alpha=alpha, rasterized=True))
 
-        for j in range(nTraceWalkers):
-            axes[k].plot(mcmcResults.sampler_results['chain'][trace_inds[j],:,k].T, '-',
-                    color=trace_colors[j], lw=lwTrace, alpha=alphaTrace)
+        segs_trace = np.empty((nTraceWalkers, len(steps), 2))
+        segs_trace[..., 0] = steps
+        segs_trace[..., 1] = trace_chain[..., k]
+        axes[k].add_collection(LineCollection(segs_trace, colors=trace_colors,
+                               linewidths=lwTrace, alpha=alphaTrace))
+        axes[k].autoscale_view()
 
 
         axes[k].set_ylabel(names[k])
@@ -243,7 +270,7 @@ def plot_trace_mcmc(mcmcResults, fileout=None, overwrite=False):
     #############################################################
     # Save to file:
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
     else:
         plt.show()
@@ -282,7 +309,7 @@ def plot_trace_nested(bayesianResults, fileout=None, overwrite=False):
     #############################################################
     # Save to file:
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
     else:
         plt.show()
@@ -310,7 +337,7 @@ def plot_run_nested(bayesianResults, fileout=None, overwrite=False):
     #############################################################
     # Save to file:
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
     else:
         plt.show()
@@ -428,6 +455,10 @@ def plot_corner_mcmc(mcmcResults, gal=None, fileout=None, step_slice=None,
 
 
 
+    # corner works on the transposed chain, one parameter row at a time:
+    # store each parameter column contiguously for the histograms.
+    sampler_chain = np.asfortranarray(sampler_chain)
+
     title_kwargs = {'horizontalalignment': 'left', 'x': 0.}
     fig = corner.corner(sampler_chain,
                             labels=names,
@@ -551,7 +582,7 @@ def plot_corner_nested(bayesianResults, fileout=None, overwrite=False):
     # Save to file:
 
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
 
     return None
@@ -574,7 +605,11 @@ def plot_data_model_comparison(gal,theta=None,
                                **plot_kwargs):
 
 
-    dummy_gal = copy.deepcopy(gal)
+    # Only copy the galaxy if its model is changed here:
+    if remove_shift or (theta is not None):
+        dummy_gal = copy.deepcopy(gal)
+    else:
+        dummy_gal = gal
 
     if remove_shift:
         dummy_gal.model.geometries[obs.name].xshift = 0
@@ -621,8 +656,16 @@ def plot_single_obs_data_model_comparison(obs, model, theta = None,
     Plot data, model, and residuals between the data and this model.
     """
 
-    dummy_obs = copy.deepcopy(obs)
-    dummy_model = copy.deepcopy(model)
+    # The 0D-2D plots do not modify obs or model, so only copy them
+    #   for the 3D plots or when the model shift is removed here:
+    if obs.instrument.ndim == 3:
+        dummy_obs = copy.deepcopy(obs)
+    else:
+        dummy_obs = obs
+    if remove_shift or (obs.instrument.ndim == 3):
+        dummy_model = copy.deepcopy(model)
+    else:
+        dummy_model = model
 
     if remove_shift:
         dummy_model.geometries[obs.name].xshift = 0
@@ -710,7 +753,7 @@ def plot_data_model_comparison_0D(obs, fileout=None,
 
     # Save to file:
     if fileout is not None:
-        f.savefig(fileout, bbox_inches='tight', dpi=300)
+        f.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close(f)
     else:
         plt.show()
@@ -735,6 +778,8 @@ def plot_data_model_comparison_1D(obs, fileout=None, overwrite=False):
 
 
     if inst_corr:
+            # Correct a copy, leaving obs.model_data unchanged:
+            model_data = copy.deepcopy(obs.model_data)
             model_data.data['dispersion'] = \
                 np.sqrt( model_data.data['dispersion']**2 - \
                     obs.instrument.lsf.dispersion.to(u.km/u.s).value**2 )
@@ -918,7 +963,7 @@ def plot_data_model_comparison_1D(obs, fileout=None, overwrite=False):
     #############################################################
     # Save to file:
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
     else:
         plt.show()
@@ -1023,8 +1068,9 @@ def plot_data_model_comparison_2D(obs, model,
         annstr_arr.append('f')
 
         if obs.data is not None:
-            flux_vmin = obs.data.data['flux'][obs.data.mask].min()
-            flux_vmax = obs.data.data['flux'][obs.data.mask].max()
+            flux_data = np.where(obs.data.mask, obs.data.data['flux'], np.nan)
+            flux_vmin = np.nanmin(flux_data)
+            flux_vmax = np.nanmax(flux_data)
             if flux_vmin == flux_vmax:
                 flux_vmin = obs.model_data.data['flux'].min()
                 flux_vmax = obs.model_data.data['flux'].max()
@@ -1032,7 +1078,7 @@ def plot_data_model_comparison_2D(obs, model,
             flux_vmin = obs.model_data.data['flux'].min()
             flux_vmax = obs.model_data.data['flux'].max()
         if max_residual_flux is None:
-            max_residual_flux = np.max(np.abs(obs.data.data['flux'][obs.data.mask]))
+            max_residual_flux = np.nanmax(np.abs(flux_data))
 
     if obs.fit_options.fit_velocity:
         keyyarr.append('velocity')
@@ -1040,8 +1086,9 @@ def plot_data_model_comparison_2D(obs, model,
         grid_arr.append(grid_vel)
         annstr_arr.append('V')
 
-        vel_vmin = obs.data.data['velocity'][obs.data.mask].min()
-        vel_vmax = obs.data.data['velocity'][obs.data.mask].max()
+        vel_data = np.where(obs.data.mask, obs.data.data['velocity'], np.nan)
+        vel_vmin = np.nanmin(vel_data)
+        vel_vmax = np.nanmax(vel_data)
 
         try:
             vel_shift = model.geometries[obs.name].vel_shift.value
@@ -1058,8 +1105,9 @@ def plot_data_model_comparison_2D(obs, model,
         annstr_arr.append('\sigma')
 
         if obs.data is not None:
-            disp_vmin = obs.data.data['dispersion'][obs.data.mask].min()
-            disp_vmax = obs.data.data['dispersion'][obs.data.mask].max()
+            disp_data = np.where(obs.data.mask, obs.data.data['dispersion'], np.nan)
+            disp_vmin = np.nanmin(disp_data)
+            disp_vmax = np.nanmax(disp_data)
         else:
             disp_vmin = obs.model_data.data['dispersion'].min()
             disp_vmax = obs.model_data.data['dispersion'].max()
@@ -1068,50 +1116,40 @@ def plot_data_model_comparison_2D(obs, model,
 
     int_mode = "nearest"
     origin = 'lower'
-    cmap = copy.copy(cmap_spectral_r)
-
-    # color_bad = 'black'
-    # color_annotate = 'white'
-    color_bad = 'white'
+    cmap = _cmap_maps
     color_annotate = 'black'
 
-    cmap.set_bad(color=color_bad)
-
-    cmap_resid = copy.copy(cmap_rdbu_r)
-    cmap_resid.set_bad(color=color_bad)
+    cmap_resid = _cmap_resid
 
+    if inst_corr and ('dispersion' in keyyarr):
+        inst_corr_sq = obs.instrument.lsf.dispersion.to(u.km / u.s).value ** 2
 
 
     for j in range(len(keyyarr)):
         grid = grid_arr[j]
 
-        for ax, k, xt in zip(grid, keyxarr, keyxtitlearr):
-
-            if k == 'data':
-                im = obs.data.data[keyyarr[j]].copy()
+        # Masked data, model and residual maps, built once per row:
+        im_data = obs.data.data[keyyarr[j]]
+        im_model = obs.model_data.data[keyyarr[j]]
+        if (keyyarr[j] == 'dispersion') and inst_corr:
+            im_model = np.sqrt(im_model ** 2 - inst_corr_sq)
+        ims = {'residual': im_data - im_model}
+        if keyyarr[j] == 'velocity':
+            ims['data'] = im_data - vel_shift
+            ims['model'] = im_model - vel_shift
+        else:
+            ims['data'] = im_data
+            ims['model'] = im_model
+        for key in ims.keys():
+            ims[key] = np.where(obs.data.mask, ims[key], np.nan)
 
-                if keyyarr[j] == 'velocity':
-                    im -= vel_shift
-                    vmin = vel_vmin
-                    vmax = vel_vmax
-                elif keyyarr[j] == 'dispersion':
-                    vmin = disp_vmin
-                    vmax = disp_vmax
-                elif keyyarr[j] == 'flux':
-                    vmin = flux_vmin
-                    vmax = flux_vmax
+        for ax, k, xt in zip(grid, keyxarr, keyxtitlearr):
 
-                cmaptmp = cmap
-            elif k == 'model':
-                im = obs.model_data.data[keyyarr[j]].copy()
+            if k in ['data', 'model']:
                 if keyyarr[j] == 'velocity':
-                    im -= vel_shift
                     vmin = vel_vmin
                     vmax = vel_vmax
                 elif keyyarr[j] == 'dispersion':
-                    if inst_corr:
-                        im = np.sqrt(im ** 2 - obs.instrument.lsf.dispersion.to(
-                                     u.km / u.s).value ** 2)
                     vmin = disp_vmin
                     vmax = disp_vmax
                 elif keyyarr[j] == 'flux':
@@ -1120,13 +1158,6 @@ def plot_data_model_comparison_2D(obs, model,
 
                 cmaptmp = cmap
             elif k == 'residual':
-                im_data = obs.data.data[keyyarr[j]].copy()
-                im_model = obs.model_data.data[keyyarr[j]].copy()
-                if keyyarr[j] == 'dispersion':
-                    if inst_corr:
-                        im_model = np.sqrt(im_model ** 2 -
-                                       obs.instrument.lsf.dispersion.to( u.km / u.s).value ** 2)
-                im = im_data - im_model
                 if symmetric_residuals:
                     if keyyarr[j] == 'flux':
                         vmin = -max_residual_flux
@@ -1139,12 +1170,12 @@ def plot_data_model_comparison_2D(obs, model,
             else:
                 raise ValueError("key not supported.")
 
+            im = ims[k]
 
+            # Only the displayed image is cast to float32 (half the data
+            #   passed through the colormap); stats and contours use float64.
 
-            # Mask image:
-            im[~obs.data.mask] = np.nan
-
-            imax = ax.imshow(im, cmap=cmaptmp, interpolation=int_mode,
+            imax = ax.imshow(im.astype(np.float32), cmap=cmaptmp, interpolation=int_mode,
                              vmin=vmin, vmax=vmax, origin=origin)
             if len(model.geometries) > 0:
                 ax = plot_major_minor_axes_2D(ax, obs, model, im, obs.data.mask)
@@ -1191,7 +1222,7 @@ def plot_data_model_comparison_2D(obs, model,
     #############################################################
     # Save to file:
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
     else:
         plt.draw()
@@ -1519,7 +1550,7 @@ def plot_aperture_compare_3D_cubes(obs, model, datacube=None, errcube=None,
     f.suptitle(suptitle, fontsize=16, y=0.925)
 
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
     else:
         plt.draw()
@@ -1738,7 +1769,7 @@ def plot_spaxel_compare_3D_cubes(obs, datacube=None, errcube=None,
         f.suptitle(suptitle, fontsize=ytitlefontsize, y=ytitlepos)
 
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
     else:
         plt.draw()
@@ -1923,7 +1954,7 @@ def plot_channel_maps_3D_cube(obs, model, show_data=True,
     # Save to file:
 
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
     else:
         plt.draw()
@@ -2121,7 +2152,7 @@ def plot_spaxels_cube(cube=None, hdr=None, mask=None,
         f.suptitle(suptitle, fontsize=ytitlefontsize, y=ytitlepos)
 
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
     else:
         plt.draw()
@@ -2324,7 +2355,7 @@ def plot_channel_maps_cube(cube=None, hdr=None, mask=None,
     # Save to file:
 
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
     else:
         plt.draw()
@@ -2523,7 +2554,7 @@ def plot_channel_maps_cube_overlay(obs, model,
     # Save to file:
 
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
     else:
         plt.draw()
@@ -2828,7 +2859,7 @@ def plot_single_obs_model_1D(obs,
     #############################################################
     # Save to file:
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
     else:
         plt.show()
@@ -2927,18 +2958,16 @@ def plot_single_obs_model_2D(obs, model,
         keyytitlearr.append(r'Flux')
         grid_arr.append(grid_flux)
 
-        msk = np.isfinite(obs.model_data.data['flux'])
-        flux_vmin = obs.model_data.data['flux'][msk].min()
-        flux_vmax = obs.model_data.data['flux'][msk].max()
+        flux_vmin = np.nanmin(obs.model_data.data['flux'])
+        flux_vmax = np.nanmax(obs.model_data.data['flux'])
 
     if obs.fit_options.fit_velocity:
         keyyarr.append('velocity')
         keyytitlearr.append(r'$V$')
         grid_arr.append(grid_vel)
 
-        msk = np.isfinite(obs.model_data.data['velocity'])
-        vel_vmin = obs.model_data.data['velocity'][msk].min()
-        vel_vmax = obs.model_data.data['velocity'][msk].max()
+        vel_vmin = np.nanmin(obs.model_data.data['velocity'])
+        vel_vmax = np.nanmax(obs.model_data.data['velocity'])
         if np.abs(vel_vmax) > 400.:
             vel_vmax = 400.
         if np.abs(vel_vmin) > 400.:
@@ -2949,9 +2978,8 @@ def plot_single_obs_model_2D(obs, model,
         keyytitlearr.append(r'$\sigma$')
         grid_arr.append(grid_disp)
 
-        msk = np.isfinite(obs.model_data.data['dispersion'])
-        disp_vmin = obs.model_data.data['dispersion'][msk].min()
-        disp_vmax = obs.model_data.data['dispersion'][msk].max()
+        disp_vmin = np.nanmin(obs.model_data.data['dispersion'])
+        disp_vmax = np.nanmax(obs.model_data.data['dispersion'])
 
         if np.abs(disp_vmax) > 500:
             disp_vmax = 500.
@@ -2964,6 +2992,9 @@ def plot_single_obs_model_2D(obs, model,
 
     cmap.set_bad(color=color_bad)
 
+    if inst_corr and ('dispersion' in keyyarr):
+        inst_corr_sq = obs.instrument.lsf.dispersion.to(u.km / u.s).value ** 2
+
     for j in range(len(keyyarr)):
         msk = np.isfinite(obs.model_data.data[keyyarr[j]])
         # Also use mask if defined:
@@ -2971,7 +3002,8 @@ def plot_single_obs_model_2D(obs, model,
         grid = grid_arr[j]
 
         for ax, k in zip(grid, keyxarr):
-            im = copy.deepcopy(obs.model_data.data[keyyarr[j]])
+            # Transient float32 copy for display
+            im = obs.model_data.data[keyyarr[j]].astype(np.float32)
             if apply_mask:
                 im[~msk] = np.NaN
             if keyyarr[j] == 'flux':
@@ -2989,11 +3021,10 @@ def plot_single_obs_model_2D(obs, model,
 
             elif keyyarr[j] == 'dispersion':
                 if inst_corr:
-                    im = np.sqrt(im ** 2 - obs.instrument.lsf.dispersion.to(
-                                 u.km / u.s).value ** 2)
+                    im = np.sqrt(im ** 2 - inst_corr_sq)
 
-                    disp_vmin = max(0, np.sqrt(disp_vmin**2 - obs.instrument.lsf.dispersion.to(u.km / u.s).value ** 2))
-                    disp_vmax = np.sqrt(disp_vmax**2 - obs.instrument.lsf.dispersion.to(u.km / u.s).value ** 2)
+                    disp_vmin = max(0, np.sqrt(disp_vmin**2 - inst_corr_sq))
+                    disp_vmax = np.sqrt(disp_vmax**2 - inst_corr_sq)
 
                 vmin = disp_vmin
                 vmax = disp_vmax
@@ -3041,7 +3072,7 @@ def plot_single_obs_model_2D(obs, model,
     #############################################################
     # Save to file:
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
     else:
         plt.draw()
@@ -3132,18 +3163,10 @@ def plot_model_comparison_2D(obs1=None, obs2=None,
 
     int_mode = "nearest"
     origin = 'lower'
-    cmap = copy.copy(cmap_spectral_r)
-    bad_color = 'white'
+    cmap = _cmap_maps
     color_annotate = 'black'
-    # bad_color = 'black'
-    # color_annotate = 'white'
-    cmap.set_bad(color=bad_color)
-
 
-    cmap_resid = copy.copy(cmap_rdbu_r)
-    cmap_resid.set_bad(color=bad_color)
-    cmap_resid.set_over(color='magenta')
-    cmap_resid.set_under(color='blueviolet')
+    cmap_resid = _cmap_resid_clip
 
 
     # -----------------------
@@ -3275,7 +3298,7 @@ def plot_model_comparison_2D(obs1=None, obs2=None,
 
             if apply_mask:
                 im[~mask] = np.NaN
-            imax = ax.imshow(im, cmap=cmaptmp, interpolation=int_mode,
+            imax = ax.imshow(im.astype(np.float32), cmap=cmaptmp, interpolation=int_mode,
                              vmin=vmin, vmax=vmax, origin=origin)
 
             if show_contours:
@@ -3315,7 +3338,7 @@ def plot_model_comparison_2D(obs1=None, obs2=None,
     #############################################################
     # Save to file:
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
     else:
         plt.draw()
@@ -3680,18 +3703,17 @@ def plot_single_obs_rotcurve_components(obs, model,
         #############################################################
         # Save to file:
 
-        plt.savefig(plotfile, bbox_inches='tight', dpi=300)
+        plt.savefig(plotfile, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
 
     return None
 
 def make_clean_bayesian_plot_names(bayesianResults, short=False):
     names = []
-    for key in bayesianResults.free_param_names.keys():
-        for i in range(len(bayesianResults.free_param_names[key])):
-            param = bayesianResults.free_param_names[key][i]
-            key_nice = " ".join(key.split("_"))
-            param_nice = " ".join(param.split("_"))
+    for key, params in bayesianResults.free_param_names.items():
+        key_nice = key.replace("_", " ")
+        for param in params:
+            param_nice = param.replace("_", " ")
             if short:
                 names.append(param_nice)
             else:
@@ -4305,11 +4327,9 @@ def plot_axes_flux_vel_disp(flux, vel, disp, axes=None,
 
     int_mode = "nearest"
     origin = 'lower'
-    bad_color = 'white'
     color_annotate = 'black'
     if cmap is None:
-        cmap = copy.copy(cmap_spectral_r)
-        cmap.set_bad(color=bad_color)
+        cmap = _cmap_maps
 
 
     for i, im in enumerate(ims):
@@ -4410,14 +4430,9 @@ def plot_2D_from_cube_files(fileout=None,
         if key not in kwargs.keys():
             kwargs[key] = _kwargs_contour_defaults[key]
 
-    cmap = copy.copy(cmap_spectral_r)
-    bad_color = 'white'
-    cmap.set_bad(color=bad_color)
+    cmap = _cmap_maps
 
-    cmap_resid = copy.copy(cmap_rdbu_r)
-    cmap_resid.set_bad(color=bad_color)
-    cmap_resid.set_over(color='magenta')
-    cmap_resid.set_under(color='blueviolet')
+    cmap_resid = _cmap_resid_clip
 
 
 
@@ -4551,7 +4566,7 @@ def plot_2D_from_cube_files(fileout=None,
     #############################################################
     # Save plot to file or display directly:
     if fileout is not None:
-        plt.savefig(fileout, bbox_inches='tight', dpi=300)
+        plt.savefig(fileout, bbox_inches='tight', dpi=SAVEFIG_DPI)
         plt.close()
     else:
         plt.draw()
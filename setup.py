@@ -6,6 +6,7 @@ import os
 import re
 import site
 import copy
+import ctypes.util
 import tempfile
 import shutil
 import platform
@@ -52,6 +53,26 @@ for site_package in site_packages:
 include_dirs=["/usr/include", "/usr/include/x86_64-linux-gnu", "/usr/include/aarch64-linux-gnu", "/usr/local/include", "/opt/local/include"]
 library_dirs=["/usr/lib", "/usr/lib/x86_64-linux-gnu", "/usr/lib/aarch64-linux-gnu", "/usr/local/lib", "/opt/local/lib"]
 
+# Homebrew on Apple silicon installs outside /usr/local
+if platform.system() == 'Darwin':
+    include_dirs.append("/opt/homebrew/include")
+    library_dirs.append("/opt/homebrew/lib")
+
+# Put the GSL and CFITSIO paths reported by pkg-config first, if available,
+#   so that the libraries the system is configured with are found before
+#   any other copies in the default paths above
+def _pkg_config_dirs(packages, option, prefix):
+    try:
+        out = subprocess.run(['pkg-config', option] + packages, check=True,
+                             capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return []
+    return [flag[len(prefix):] for flag in out.split() if flag.startswith(prefix)]
+
+for pkg in ['gsl', 'cfitsio']:
+    include_dirs[:0] = [d for d in _pkg_config_dirs([pkg], '--cflags-only-I', '-I') if d not in include_dirs]
+    library_dirs[:0] = [d for d in _pkg_config_dirs([pkg], '--libs-only-L', '-L') if d not in library_dirs]
+
 # Add CONDA include and lib paths if necessary
 conda_include_path = "."
 conda_lib_path = "."
@@ -152,6 +173,77 @@ symbols_leastChiSquares1D = ["GlobalDebug", "isLittleEndian", "setGlobalDebugLev
                              "fitLeastChiSquares1DForDataCube", "fitLeastChiSquares1DForDataCubeWithMultiThread", 
                              "destroyLeastChiSquares1D", "freeDataArrayMemory"]
 
+# Optimization flags for the C++ extensions. -ffast-math is not used, as the
+#   lensing code relies on std::isnan; set DYSMALPY_NATIVE=0 to build
+#   portable binaries instead of tuning for the build machine.
+#   The C++ sources neither catch exceptions nor use RTTI.
+cpp_compile_args = ['-std=c++17', '-fno-exceptions', '-fno-rtti',
+                    '-O3', '-fno-math-errno', '-funroll-loops']
+cpp_link_args = ['-O3']
+machine = platform.machine().lower()
+if os.getenv('DYSMALPY_NATIVE', '1') != '0':
+    if machine in ['arm64', 'aarch64']:
+        cpp_compile_args.append('-mcpu=native')
+    else:
+        cpp_compile_args.extend(['-march=native', '-mtune=native'])
+elif machine in ['x86_64', 'amd64']:
+    cpp_compile_args.append('-march=x86-64-v3')
+# Link-time optimization (set DYSMALPY_LTO=0 to disable, e.g. for debugging)
+if os.getenv('DYSMALPY_LTO', '1') != '0':
+    cpp_compile_args.append('-flto')
+    cpp_link_args.append('-flto')
+    if platform.system() == 'Linux':
+        cpp_compile_args.append('-fno-semantic-interposition')
+# Profile-guided optimization, in two builds: DYSMALPY_PGO=generate builds
+#   instrumented extensions, whose runs (e.g. the test suite) write profiles
+#   to DYSMALPY_PGO_DIR; DYSMALPY_PGO=use then rebuilds with those profiles.
+pgo_mode = os.getenv('DYSMALPY_PGO', '').lower()
+pgo_dir = os.getenv('DYSMALPY_PGO_DIR', os.path.join(dir_path, 'pgo-data'))
+if pgo_mode == 'generate':
+    cpp_compile_args.append('-fprofile-generate={}'.format(pgo_dir))
+    cpp_link_args.append('-fprofile-generate={}'.format(pgo_dir))
+elif pgo_mode == 'use':
+    cpp_compile_args.extend(['-fprofile-use={}'.format(pgo_dir), '-fprofile-correction'])
+    cpp_link_args.append('-fprofile-use={}'.format(pgo_dir))
+elif pgo_mode != '':
+    log.warning('Unknown DYSMALPY_PGO={!r}, expected "generate" or "use"'.format(pgo_mode))
+# No debug information in the released extensions
+cpp_compile_args.append('-g0')
+if platform.system() == 'Linux':
+    cpp_link_args.append('-Wl,--strip-debug')
+# The same optimization flags, without the C++-only ones, for the Cython cutils
+c_compile_args = [arg for arg in cpp_compile_args
+                  if not arg.startswith(('-std=', '-fno-exceptions', '-fno-rtti'))]
+
+# CBLAS library that GSL dispatches its BLAS calls to. The extensions only do
+#   small Level-1 operations, so GSL's own gslcblas is the default; set e.g.
+#   DYSMALPY_CBLAS=openblas to link an optimized CBLAS instead.
+def _cblas_libs():
+    cblas = os.getenv('DYSMALPY_CBLAS', 'gslcblas')
+    if (cblas != 'gslcblas') and (ctypes.util.find_library(cblas) is None):
+        log.warning('CBLAS library {!r} not found, using gslcblas'.format(cblas))
+        cblas = 'gslcblas'
+    return [cblas]
+
+cblas_libraries = _cblas_libs()
+
+# Inline GSL's vector/matrix accessors, without their range checks
+gsl_define_macros = [('HAVE_INLINE', None), ('GSL_RANGE_CHECK_OFF', None)]
+
+# OpenMP for the lensingTransformer pixel loops and the cutils prange loop.
+#   Apple clang needs libomp, so it is only enabled there with
+#   DYSMALPY_OPENMP=1; set DYSMALPY_OPENMP=0 to disable it elsewhere.
+openmp_compile_args = []
+openmp_link_args = []
+openmp_libraries = []
+if platform.system() == 'Darwin':
+    if os.getenv('DYSMALPY_OPENMP', '0') == '1':
+        openmp_compile_args = ['-Xpreprocessor', '-fopenmp']
+        openmp_libraries = ['omp']
+elif os.getenv('DYSMALPY_OPENMP', '1') != '0':
+    openmp_compile_args = ['-fopenmp']
+    openmp_link_args = ['-fopenmp']
+
 # Only the mandatory modules
 original_ext_modules = [
         # Basic modules
@@ -159,17 +251,22 @@ original_ext_modules = [
                 sources=["dysmalpy/models/cutils.pyx"],   
                 include_dirs=include_dirs,
                 library_dirs=library_dirs,
+                extra_compile_args=c_compile_args+openmp_compile_args,
+                extra_link_args=cpp_link_args+openmp_link_args,
+                libraries=openmp_libraries,
                 ),
         # Lensing transformer
         Extension("dysmalpy.lensingTransformer",
                     sources=["dysmalpy/lensing_transformer/lensingTransformer.cpp"],
                     language="c++",
                     include_dirs=include_dirs+["lensing_transformer"],
-                    libraries=['gsl', 'gslcblas', 'cfitsio'],
+                    libraries=['gsl']+cblas_libraries+['cfitsio']+openmp_libraries,
                     library_dirs=library_dirs,
                     depends=["dysmalpy/lensing_transformer/lensingTransformer.hpp"],
                     export_symbols=symbols_lensingTransformer,
-                    extra_compile_args=['-std=c++11'], 
+                    define_macros=gsl_define_macros,
+                    extra_compile_args=cpp_compile_args+openmp_compile_args,
+                    extra_link_args=cpp_link_args+openmp_link_args,
                     optional=True
                 ),
         # Chi squared fitter
@@ -177,20 +274,43 @@ original_ext_modules = [
                     sources=["dysmalpy/utils_least_chi_squares_1d_fitter/leastChiSquares1D.cpp"],
                     language="c++",
                     include_dirs=include_dirs+["utils_least_chi_squares_1d_fitter"],
-                    libraries=['gsl', 'gslcblas', 'pthread'],
+                    libraries=['gsl']+cblas_libraries+['pthread'],
                     library_dirs=library_dirs,
                     depends=["dysmalpy/utils_least_chi_squares_1d_fitter/leastChiSquares1D.hpp",
                             "dysmalpy/utils_least_chi_squares_1d_fitter/leastChiSquaresFunctions1D.hpp"],
                     export_symbols=symbols_leastChiSquares1D,
-                    extra_compile_args=['-std=c++11'], 
+                    define_macros=gsl_define_macros,
+                    extra_compile_args=cpp_compile_args,
+                    extra_link_args=cpp_link_args,
                     optional=True
                 )
             ]
 
-# Cythonize the extensions (default to the site-packages directory)
-ext_modules = cythonize(original_ext_modules, annotate=True)
+# Cythonize the extensions (default to the site-packages directory).
+#   The compiler directives are in the cutils.pyx header, so that the
+#   pyximport build in ModelSet uses them too.
+#   Translations are cached (in CYTHON_CACHE_DIR if set, else Cython's default).
+ext_modules = cythonize(original_ext_modules, annotate=True,
+                        nthreads=max(1, (os.cpu_count() or 1)//2),
+                        cache=os.getenv('CYTHON_CACHE_DIR', True))
 
 class BuildExtCommand(build_ext):
+    def finalize_options(self):
+        build_ext.finalize_options(self)
+        # Compile the extensions in parallel, unless -j is given
+        if self.parallel is None:
+            self.parallel = os.cpu_count()
+
+    def build_extensions(self):
+        # Opt-in: DYSMALPY_CCACHE=1 runs the (already configured) compilers through ccache
+        if ((os.getenv('DYSMALPY_CCACHE', '0') == '1') and (self.compiler.compiler_type == 'unix')
+                and (shutil.which('ccache') is not None)):
+            for attr in ['compiler_so', 'compiler_so_cxx']:
+                cmd = getattr(self.compiler, attr, None)
+                if cmd and (os.path.basename(cmd[0]) != 'ccache'):
+                    setattr(self.compiler, attr, ['ccache'] + list(cmd))
+        build_ext.build_extensions(self)
+
     def run(self):
         # Run the original build_ext command with --inplace for the local directory
         self.inplace = True
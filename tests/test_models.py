@@ -9,6 +9,10 @@ import shutil
 import math
 
 import numpy as np
+import scipy.optimize as scp_opt
+import scipy.interpolate as scp_interp
+import scipy.special as scp_spec
+import scipy.ndimage as scp_ndi
 import astropy.io.fits as fits
 import astropy.units as u
 
@@ -16,6 +20,7 @@ from dysmalpy.fitting_wrappers import dysmalpy_make_model
 from dysmalpy.fitting_wrappers import utils_io as fw_utils_io
 
 from dysmalpy import galaxy, models, parameters, instrument, config, observation
+from dysmalpy.utils import get_cin_cout
 
 import logging
 logger = logging.getLogger('DysmalPy')
@@ -31,6 +36,78 @@ _dir_tests_data = _dir_tests+'test_data' + os.sep
 _dir_gaussian_ring_tables = os.getenv('GAUSSIAN_RING_PROFILE_DATADIR', None)
 
 
+def _adiabatic_contract_reference(r1d, vhalo1d_sq, vbaryon1d_sq, modify_small_values=True):
+    # Per-radius secant solve of the adiabatic contraction equation, interpolating
+    # v_DM with interp1d: the implementation before the compiled Newton solve
+    def _adiabatic_sq(rprime, r_adi, adia_v_dm_sq, adia_x_dm, adia_v_disk_sq):
+        if rprime <= 0.:
+            rprime = 0.1
+        if rprime < adia_x_dm[1]:
+            rprime = adia_x_dm[1]
+        rprime_interp = scp_interp.interp1d(adia_x_dm, np.sqrt(adia_v_dm_sq),
+                                            fill_value="extrapolate")
+        return (r_adi + r_adi * ((r_adi*adia_v_disk_sq) /
+                                 (rprime*(rprime_interp(rprime))**2)) - rprime)
+
+    rprime_all_1d = np.zeros(len(r1d))
+    converged = np.zeros(len(r1d), dtype=bool)
+    for i in range(len(r1d)):
+        try:
+            result = scp_opt.newton(_adiabatic_sq, r1d[i] + 1.,
+                                    args=(r1d[i], vhalo1d_sq, r1d, vbaryon1d_sq[i]),
+                                    maxiter=200)
+            converged[i] = True
+        except:
+            result = r1d[i]
+            converged[i] = False
+
+        if modify_small_values:
+            if ((result < 0.) | (result > 5*max(r1d))):
+                result = r1d[i]
+                converged[i] = False
+
+        rprime_all_1d[i] = result
+
+    return rprime_all_1d, converged
+
+
+def _bicone_reference(bicone, x, y, z):
+    # Biconical outflow velocity and flux, computed from theta = arccos(|z|/r)
+    # on the full grid, without the cached radius / cone mask
+    n, vmax, rturn = bicone.n.value, bicone.vmax.value, bicone.rturn.value
+    thetain, dtheta, rend = bicone.thetain.value, bicone.dtheta.value, bicone.rend.value
+
+    r = np.sqrt(x**2 + y**2 + z**2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        theta = np.arccos(np.abs(z)/r)*180./np.pi
+    theta[r == 0] = 0.
+    vel = np.zeros(r.shape)
+
+    if bicone.profile_type == 'increase':
+        amp = vmax/rend**n
+        vel[r <= rend] = amp*r[r <= rend]**n
+        vel[r == 0] = 0
+    elif bicone.profile_type == 'decrease':
+        amp = -vmax/rend**n
+        vel[r <= rend] = vmax + amp*r[r <= rend]** n
+    elif bicone.profile_type == 'both':
+        vel[r <= rturn] = vmax*(r[r <= rturn]/rturn)**n
+        ind = (r > rturn) & (r <= 2*rturn)
+        vel[ind] = vmax*(2 - r[ind]/rturn)**n
+    elif bicone.profile_type == 'constant':
+        vel[r <= rend] = vmax
+
+    thetaout = np.min([thetain+dtheta, 90.])
+    ind_zero = (theta < thetain) | (theta > thetaout) | (vel < 0)
+    vel[ind_zero] = 0.
+
+    flux = 10**bicone.norm_flux.value*np.exp(-bicone.tau_flux.value*(r/rend))
+    ind_zero = (theta < thetain) | (theta > thetaout) | (r > rend)
+    flux[ind_zero] = 1e-16
+
+    return vel, flux
+
+
 class HelperSetups(object):
 
     def __init__(self):
@@ -154,6 +231,31 @@ class HelperSetups(object):
 
         return halo
 
+    def setup_DZ(self):
+        # Dekel-Zhao Halo component, with s1, c2 tied to Mstar/Mvir
+        mvirial = 12.0
+        s1 = 1.5
+        c2 = 25.
+        fdm = 0.5
+
+        halo_fixed = {'mvirial': False,
+                      's1': False,
+                      'c2': False,
+                      'fdm': False}
+
+        halo_bounds = {'mvirial': (10, 13),
+                       's1': (0., 2.),
+                       'c2': (0., 40.),
+                       'fdm': (0., 1.)}
+
+        halo = models.DekelZhao(mvirial=mvirial, s1=s1, c2=c2, fdm=fdm, z=self.z,
+                                fixed=halo_fixed, bounds=halo_bounds, name='halo')
+
+        halo.s1.tied = fw_utils_io.tie_DZ_s1_MstarMhalo
+        halo.c2.tied = fw_utils_io.tie_DZ_c2_MstarMhalo
+
+        return halo
+
     def setup_const_dispprof(self):
         # Dispersion profile
         sigma0 = 39.   # km/s
@@ -346,6 +448,61 @@ class TestModels:
     helper = HelperSetups()
 
 
+    def test_geometry_affine_matrix(self):
+        from dysmalpy.models import geometry
+
+        atol = 1.e-14
+        for inc in [0., 10., 45., 62., 90.]:
+            for pa in [-180., -90., 0., 30., 90., 142., 180.]:
+                inc_rad = np.pi / 180. * inc
+                pa_rad = np.pi / 180. * (pa - 90.)
+                minc = np.array([[np.cos(inc_rad), np.sin(inc_rad),  0.],
+                                 [-np.sin(inc_rad), np.cos(inc_rad), 0.],
+                                 [0., 0., 1.]])
+                mpa = np.array([[1., 0., 0.],
+                                [0., np.cos(pa_rad), -np.sin(pa_rad)],
+                                [0., np.sin(pa_rad), np.cos(pa_rad)]])
+
+                # Assert the closed form matches the product of the rotations
+                assert np.allclose(geometry._affine_matrix_cached(inc, pa),
+                                   np.matmul(minc, mpa), rtol=0., atol=atol)
+
+    def test_geometry_transform_cube_affine(self):
+        geom = self.helper.setup_geom()
+
+        rng = np.random.default_rng(42)
+        cube = rng.uniform(0., 1., (15, 16, 17))
+        c_in = c_out = get_cin_cout(cube.shape)
+
+        for interp_order in [3, 1]:
+            geom.interp_order = interp_order
+
+            # Reference: rotation matrices composed on every call
+            inc_rad = np.pi / 180. * geom.inc.value
+            pa_rad = np.pi / 180. * (geom.pa.value - 90.)
+            minc = np.array([[np.cos(inc_rad), np.sin(inc_rad),  0.],
+                             [-np.sin(inc_rad), np.cos(inc_rad), 0.],
+                             [0., 0., 1.]])
+            mpa = np.array([[1., 0., 0.],
+                            [0., np.cos(pa_rad), -np.sin(pa_rad)],
+                            [0., np.sin(pa_rad), np.cos(pa_rad)]])
+            transf_matrix = np.matmul(minc, mpa)
+            offset_arr = np.array([0., geom.yshift.value, geom.xshift.value])
+            offset_transf = c_in-np.matmul(transf_matrix,c_out+offset_arr)
+            cube_sky_ref = scp_ndi.affine_transform(cube, transf_matrix,
+                                offset=offset_transf, order=interp_order)
+
+            cube_sky = geom.transform_cube_affine(cube)
+            assert np.allclose(cube_sky, cube_sky_ref, rtol=1.e-12, atol=1.e-12)
+
+            # Assert the face-on, pa = 90 transform leaves the cube unchanged
+            assert np.allclose(geom.transform_cube_affine(cube, inc=0., pa=90.), cube,
+                               rtol=0., atol=1.e-10)
+
+        # Assert linear interpolation does not overshoot the input range
+        cube_sky = geom.transform_cube_affine(cube)
+        assert (cube_sky.min() >= 0.) & (cube_sky.max() <= cube.max())
+
     def test_diskbulge(self):
         bary = self.helper.setup_diskbulge()
 
@@ -435,6 +592,74 @@ class TestModels:
             assert math.isclose(halo.circular_velocity(r), vcirc[i], rel_tol=ftol)
             assert math.isclose(halo.enclosed_mass(r), menc[i], rel_tol=ftol)
 
+    def test_NFW_circular_velocity_batch(self):
+        halo = self.helper.setup_NFW()
+
+        ftol = 1.e-9
+        r = 5.  # kpc
+        mvirials = np.array([10.5, 11.5, 12.0, 12.5])
+        vcirc_batch = halo.circular_velocity_batch(r, mvirials)
+
+        for i, mvir in enumerate(mvirials):
+            halo_tmp = halo.copy()
+            halo_tmp.mvirial = mvir
+            # Assert batched values match the single-mass values
+            assert math.isclose(vcirc_batch[i], halo_tmp.circular_velocity(r), rel_tol=ftol)
+
+        # Assert mvirial is left unchanged
+        assert halo.mvirial.value == 12.0
+
+
+    def test_NFW_calc_mvirial_from_fdm(self):
+        bary = self.helper.setup_diskbulge()
+        halo = self.helper.setup_NFW()
+        r_fdm = bary.r_eff_disk.value
+
+        ftol = 1.e-6
+        mvirial = halo.calc_mvirial_from_fdm(bary, r_fdm, adiabatic_contract=False)
+
+        # Assert the solved mvirial reproduces fdm at r_fdm
+        halo_tmp = halo.copy()
+        halo_tmp.mvirial = mvirial
+        vsq_dm = halo_tmp.vcirc_sq(r_fdm)
+        fdm = vsq_dm / (vsq_dm + bary.vcirc_sq(r_fdm))
+        assert math.isclose(fdm, halo.fdm.value, rel_tol=ftol)
+
+        # Assert mvirial is left unchanged
+        assert halo.mvirial.value == 12.0
+
+    def test_DZ_tied_calc_mvirial_from_fdm(self):
+        bary = self.helper.setup_diskbulge()
+        bary.lmstar = 10.5
+        halo = self.helper.setup_DZ()
+        r_fdm = bary.r_eff_disk.value
+
+        # Reference: re-tie s1, c2 in a full ModelSet for each trial mvirial
+        def minfunc_ref(mvirial, vsqtarget):
+            halotmp = halo.copy()
+            halotmp.__setattr__('mvirial', mvirial)
+            modtmp = models.ModelSet()
+            modtmp.add_component(bary, light=True)
+            modtmp.add_component(halotmp)
+            modtmp.kinematic_options.adiabatic_contract = False
+            modtmp._update_tied_parameters()
+            return modtmp.components['halo'].vcirc_sq(r_fdm) - vsqtarget
+
+        vsqtarget = bary.vcirc_sq(r_fdm) / (1./halo.fdm.value - 1)
+        mtest = np.arange(8., 15., 0.5)
+        vtest = np.array([minfunc_ref(m, vsqtarget) for m in mtest])
+        a = mtest[vtest < 0][-1]
+        b = mtest[vtest > 0][0]
+        mvirial_ref = scp_opt.brentq(minfunc_ref, a, b, args=(vsqtarget,))
+
+        ftol = 1.e-6
+        mvirial = halo.calc_mvirial_from_fdm(bary, r_fdm, adiabatic_contract=False)
+        assert math.isclose(mvirial, mvirial_ref, rel_tol=ftol)
+
+        # Assert the halo itself is left unchanged
+        assert halo.mvirial.value == 12.0
+        assert halo.s1.value == 1.5
+        assert halo.c2.value == 25.
 
     def test_TPH(self):
         halo = self.helper.setup_TPH()
@@ -484,6 +709,66 @@ class TestModels:
                 assert math.isclose(gausring.rhogas(r), rho[i], rel_tol=ftol)
                 assert math.isclose(gausring.dlnrhogas_dlnr(r), dlnrho_dlnr[i], rel_tol=ftol)
 
+    def test_light_profiles_reference(self):
+        from dysmalpy.models import light_distributions
+
+        rtol = 1.e-10
+        xgrid = np.linspace(-6., 6., 25)   # kpc
+        x, y, z = np.meshgrid(xgrid, xgrid, np.array([-0.5, 0., 0.5]), indexing='ij')
+        R = np.sqrt(x**2 + y**2)
+
+        # Profiles are evaluated at float64 by default
+        assert light_distributions.LIGHT_DTYPE == np.float64
+
+        # Clump: Sersic profile about the clump center
+        for n, r_center, phi in [(1., 2., 30.), (2.5, 3.5, 200.), (4., 0., 0.)]:
+            clump = models.LightClump(L_tot=1., r_eff=0.8, n=n, r_center=r_center,
+                                      phi=phi, theta=90., name='clump', tracer='halpha')
+            phi_rad = np.pi / 180. * phi
+            r = np.sqrt((x-r_center*np.cos(phi_rad))**2 + (y-r_center*np.sin(phi_rad))**2)
+            bn = scp_spec.gammaincinv(2. * n, 0.5)
+            alpha = 0.8 / (bn ** n)
+            amp = 1. / (2 * np.pi) / alpha ** 2 / n / scp_spec.gamma(2. * n)
+            light_ref = amp * np.exp(-bn * (r / 0.8) ** (1. / n))
+
+            light = clump.light_profile(x, y, z)
+            assert light.dtype == np.float64
+            assert np.allclose(light, light_ref, rtol=rtol, atol=0.)
+
+        # Gaussian rings, without and with azimuthal variation
+        R_peak, FWHM = 3., 1.5
+        sigma_R = FWHM / (2.*np.sqrt(2.*np.log(2.)))
+        xI = R_peak / (sigma_R * np.sqrt(2.))
+        Ih = np.sqrt(np.pi)*xI*(1.+scp_spec.erf(xI)) + np.exp(-xI**2)
+        I0 = 1. / (2.*np.pi*(sigma_R**2)*Ih)
+
+        ring = models.LightGaussianRing(R_peak=R_peak, FWHM=FWHM, L_tot=1.,
+                                        name='ring', tracer='halpha')
+        rarr = np.linspace(0., 10., 101)
+        light = ring.light_profile(rarr)
+        assert light.dtype == np.float64
+        assert np.allclose(light, I0*np.exp(-(rarr-R_peak)**2/(2.*sigma_R**2)),
+                           rtol=rtol, atol=0.)
+        assert math.isclose(ring.light_profile(2.), I0*np.exp(-(2.-R_peak)**2/(2.*sigma_R**2)),
+                            rel_tol=rtol)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            phi_gal_rad = np.arcsin(y/R)
+        phi_gal_rad[x < 0] = np.pi - np.arcsin(y[x < 0]/R[x < 0])
+        phi_gal_rad[R == 0] = 0.
+        gaus_symm = I0*np.exp(-(R-R_peak)**2/(2.*sigma_R**2))
+        for phi, contrast, gamma in [(0., 1., 1.), (45., 0.3, 1.), (120., 0.3, 0.5),
+                                     (300., 0.6, 2.), (90., 0.1, 3.)]:
+            ring_azim = models.LightGaussianRingAzimuthal(R_peak=R_peak, FWHM=FWHM, L_tot=1.,
+                                                          phi=phi, contrast=contrast, gamma=gamma,
+                                                          name='ring_azim', tracer='halpha')
+            phi_rad = phi * np.pi / 180.
+            asymm_fac = 1. - (1.-contrast)*np.power(np.abs(np.sin(0.5 * (phi_gal_rad-phi_rad))),
+                                                     1./gamma)
+            light = ring_azim.light_profile(x, y, z)
+            assert light.dtype == np.float64
+            assert np.allclose(light, gaus_symm * asymm_fac, rtol=rtol, atol=0.)
+
     def test_asymm_drift_pressuregradient(self):
         gal = self.helper.setup_fullmodel(pressure_support_type=3)
 
@@ -556,6 +841,75 @@ class TestModels:
             assert math.isclose(gal_AC.model.enclosed_mass(r), menc_AC[i], rel_tol=ftol)
 
 
+    def test_adiabatic_contraction_solve(self):
+        from dysmalpy.models import kinematic_options
+
+        r1d = np.arange(0.2, 25.2, 0.2)  # kpc
+        x = r1d / 20.
+        vhalo1d = 160. * np.sqrt((np.log(1.+x) - x/(1.+x)) / (np.log(2.) - 0.5))
+        vbaryon1d_sq = (250. * (1. - np.exp(-r1d/1.5)))**2
+        # Very concentrated baryons inside 1 kpc: rprime > 5*max(r1d), so these
+        # radii are reset by adiabatic_contract_modify_small_values
+        vbaryon1d_sq_weird = vbaryon1d_sq * np.where(r1d < 1., 1.e9, 1.)
+
+        rtol = 1.e-10
+        dr = kinematic_options._uniform_grid_step(r1d)
+        for vb_sq in [vbaryon1d_sq, vbaryon1d_sq_weird]:
+            rprime_ref, converged_ref = _adiabatic_contract_reference(r1d, vhalo1d**2, vb_sq)
+
+            for solve in [kinematic_options._ac_newton_loop,
+                          kinematic_options._array_newton_adiabatic]:
+                rprime, converged = solve(r1d, vhalo1d, vb_sq, dr)
+                weird = ((rprime < 0.) | (rprime > 5*max(r1d)))
+                rprime[weird] = r1d[weird]
+                converged[weird] = False
+
+                # Assert the roots and convergence flags match the reference solve
+                assert np.allclose(rprime, rprime_ref, rtol=rtol, atol=0.)
+                assert np.array_equal(converged, converged_ref)
+
+        # Assert the reset radii are exercised
+        assert (~converged_ref).sum() > 0
+
+    def test_adiabatic_contraction_small_r(self, monkeypatch):
+        from dysmalpy.models import kinematic_options
+
+        gal_AC = self.helper.setup_fullmodel(adiabatic_contract=True, instrument=False)
+        model = gal_AC.model
+        model.kinematic_options.adiabatic_contract_modify_small_values = True
+
+        # Reference contracted halo, as in apply_adiabatic_contract:
+        rarr = np.array([0.01, 0.05, 0.1, 0.2, 0.5, 1., 2.5, 5., 10., 20.])   # kpc
+        step1d = 0.2
+        try:
+            r_ap = model._model_aperture_r()
+        except:
+            r_ap = 0.
+        rmax_calc = max(5.* r_ap, rarr.max())
+        r1d = np.arange(step1d, np.ceil(rmax_calc/step1d)*step1d+ step1d, step1d, dtype=np.float64)
+        vhalo1d_sq = model.components['halo'].vcirc_sq(r1d)
+        vbaryon1d_sq = model.components['disk+bulge'].vcirc_sq(r1d)
+
+        rprime_all_1d, converged = _adiabatic_contract_reference(r1d, vhalo1d_sq, vbaryon1d_sq)
+        vhalo_adi_interp_1d = scp_interp.interp1d(r1d, np.sqrt(vhalo1d_sq),
+                                                  fill_value='extrapolate', kind='linear')
+        if converged.sum() < len(r1d):
+            if converged.sum() >= 0.9 *len(r1d):
+                rprime_all_1d = rprime_all_1d[converged]
+                r1d = r1d[converged]
+        vhalo_adi_1d = vhalo_adi_interp_1d(rprime_all_1d)
+        vhalo_adi = scp_interp.interp1d(r1d, vhalo_adi_1d, fill_value='extrapolate',
+                                        kind='linear')(rarr)
+
+        rtol = 1.e-7
+        for numba_installed in [kinematic_options._numba_installed, False]:
+            # Compiled solve if Numba is installed, and the NumPy array solve
+            monkeypatch.setattr(kinematic_options, '_numba_installed', numba_installed)
+            vc_sq, vc_sq_dm = model.vcirc_sq(rarr, compute_dm=True)
+
+            # Assert the contracted halo matches the reference solve
+            assert np.allclose(vc_sq_dm, vhalo_adi**2, rtol=rtol, atol=0.)
+
     def test_simulate_cube(self):
         gal = self.helper.setup_fullmodel(instrument=True)
 
@@ -590,6 +944,55 @@ class TestModels:
             assert math.isclose(cube[arr[0],arr[1],arr[2]], arr[3], abs_tol=atol)
 
 
+    def test_populate_cube_numba(self):
+        from dysmalpy.models import cutils, cutils_numba
+
+        rng = np.random.default_rng(42)
+        shape = (6, 5, 4)
+        flux = rng.uniform(0., 1., shape)
+        vel = rng.uniform(-100., 100., shape)
+        sigma = rng.uniform(20., 60., shape)
+        vspec = np.linspace(-200., 200., 21)
+
+        # Indices (x, y, z) of a subset of the cells, as from _make_cube_ai:
+        zz, yy, xx = np.nonzero(rng.uniform(0., 1., shape) > 0.5)
+        ai = np.array([xx, yy, zz], dtype=np.int_)
+
+        # Assert the Numba fallback matches the Cython functions
+        assert np.allclose(cutils_numba.populate_cube(flux, vel, sigma, vspec),
+                           cutils.populate_cube(flux, vel, sigma, vspec),
+                           rtol=1.e-12, atol=0.)
+        assert np.allclose(cutils_numba.populate_cube_ais(flux, vel, sigma, vspec, ai),
+                           cutils.populate_cube_ais(flux, vel, sigma, vspec, ai),
+                           rtol=1.e-12, atol=0.)
+
+    def test_thin_plane_extinction(self, monkeypatch):
+        from dysmalpy.models import extinction
+
+        xgrid = np.linspace(-5., 5., 21)
+        x, y, z = np.meshgrid(xgrid, xgrid, xgrid, indexing='ij')
+
+        for inc, pa, xshift, yshift in [(60., 30., 0.5, -0.3), (0., 0., 0., 0.),
+                                        (90., -120., 0., 0.), (45., 90., 0., 0.)]:
+            dust = models.ThinCentralPlaneDustExtinction(inc=inc, pa=pa, xshift=xshift,
+                                                         yshift=yshift, amp_extinct=0.7,
+                                                         name='dust')
+
+            # Reference: rotate the cube into the dust plane frame
+            inc_rad = np.pi / 180. * inc
+            pa_rad = np.pi / 180. * (pa - 90.)
+            ytmp = -(x - xshift) * np.sin(pa_rad) + (y - yshift) * np.cos(pa_rad)
+            ydust = ytmp * np.cos(inc_rad) - z * np.sin(inc_rad)
+            zsky_dust = ydust * np.sin(-inc_rad)
+            atten_ref = np.ones(x.shape)
+            atten_ref[z <= zsky_dust] = 1. - 0.7
+
+            for numba_installed in [extinction._numba_installed, False]:
+                # Numba kernel if Numba is installed, and the NumPy version
+                monkeypatch.setattr(extinction, '_numba_installed', numba_installed)
+                # Assert the attenuation cube matches the reference
+                assert np.array_equal(dust.attenuation_cube(x, y, z), atten_ref)
+
     def test_uniform_inflow(self):
         gal_inflow = self.helper.setup_fullmodel(instrument=True)
         inflow = self.helper.setup_uniform_inflow()
@@ -756,6 +1159,41 @@ class TestModels:
             assert math.isclose(cube[arr[0],arr[1],arr[2]], arr[3], abs_tol=atol)
 
 
+    def test_biconical_outflow_geom_cache(self):
+        bicone, bicone_geom, bicone_disp = self.helper.setup_biconical_outflow()
+
+        rtol = 1.e-12
+        atol = 1.e-12
+        xgrid = np.linspace(-1.5, 1.5, 21)   # kpc
+        x, y, z = np.meshgrid(xgrid, xgrid, xgrid, indexing='ij')
+
+        for profile_type in ['both', 'increase', 'decrease', 'constant']:
+            bicone.profile_type = profile_type
+
+            # Assert velocity and flux match the reference, twice on the same arrays
+            for i in range(2):
+                vel_ref, flux_ref = _bicone_reference(bicone, x, y, z)
+                assert np.allclose(bicone.velocity(x, y, z), vel_ref, rtol=rtol, atol=atol)
+                assert np.allclose(bicone.light_profile(x, y, z), flux_ref, rtol=rtol, atol=atol)
+
+        # Assert parameter changes are picked up for the cached grid
+        bicone.profile_type = 'both'
+        for pname, pvalue in [('thetain', 10.), ('dtheta', 60.), ('vmax', 150.),
+                              ('rturn', 0.8), ('rend', 1.2)]:
+            bicone.__setattr__(pname, pvalue)
+            vel_ref, flux_ref = _bicone_reference(bicone, x, y, z)
+            assert np.allclose(bicone.velocity(x, y, z), vel_ref, rtol=rtol, atol=atol)
+            assert np.allclose(bicone.light_profile(x, y, z), flux_ref, rtol=rtol, atol=atol)
+
+        # Assert a new grid replaces the cached one
+        x2, y2, z2 = 0.5*x, 0.5*y, 0.5*z + 0.1
+        vel_ref, flux_ref = _bicone_reference(bicone, x2, y2, z2)
+        assert np.allclose(bicone.velocity(x2, y2, z2), vel_ref, rtol=rtol, atol=atol)
+        assert np.allclose(bicone.light_profile(x2, y2, z2), flux_ref, rtol=rtol, atol=atol)
+        vel_ref, flux_ref = _bicone_reference(bicone, x, y, z)
+        assert np.allclose(bicone.velocity(x, y, z), vel_ref, rtol=rtol, atol=atol)
+
+
 class TestModelsFittingWrappers:
     def test_fitting_wrapper_model(self):
         param_filename = 'make_model_3Dcube.params'